@@ -1,54 +1,13 @@
-import numpy as np
-import time
-import matplotlib.pyplot as plt
-from heapq import heapify, heappop
-
-# Insertion Sort
-def insertion_sort(arr):
-    for i in range(1, len(arr)):
-        key = arr[i]
-        j = i - 1
-        while j >= 0 and key < arr[j]:
-            arr[j + 1] = arr[j]
-            j -= 1
-        arr[j + 1] = key
-
-# Merge Sort
-def merge_sort(arr):
-    if len(arr) > 1:
-        mid = len(arr) // 2
-        left = arr[:mid]
-        right = arr[mid:]
-
-        merge_sort(left)
-        merge_sort(right)
-
-        i = j = k = 0
-        while i < len(left) and j < len(right):
-            if left[i] < right[j]:
-                arr[k] = left[i]
-                i += 1
-            else:
-                arr[k] = right[j]
-                j += 1
-            k += 1
-
-        while i < len(left):
-            arr[k] = left[i]
-            i += 1
-            k += 1
-
-        while j < len(right):
-            arr[k] = right[j]
-            j += 1
-            k += 1
-
-# Heap Sort
-def heap_sort(arr):
-    arr = list(arr)  # Convert numpy array to list
-    heapify(arr)
-    sorted_arr = [heappop(arr) for _ in range(len(arr))]
-    arr[:] = sorted_arr
+from gridRunner import run_grid
+from workload import generate_array
+from timing import measure_time
+from mergSort import merge_sort, merge_sort_bottom_up
+from heapSort import heap_sort
+from insertionSort import insertion_sort, binary_insertion_sort
+from selectionSort import selection_sort
+from hybridSort import hybrid_sort
+from resultStore import ResultStore
+from report import plot_results
 
 # Quick Sort
 def quick_sort(arr):
@@ -60,29 +19,12 @@ def quick_sort(arr):
     right = [x for x in arr if x > pivot]
     return quick_sort(left) + middle + quick_sort(right)
 
-# Selection Sort
-def selection_sort(arr):
-    for i in range(len(arr)):
-        min_idx = i
-        for j in range(i + 1, len(arr)):
-            if arr[j] < arr[min_idx]:
-                min_idx = j
-        arr[i], arr[min_idx] = arr[min_idx], arr[i]
-
 # Utility functions to create test arrays
-def create_array(size, presortedness):
-    arr = np.arange(size)
-    if presortedness == 0:
-        arr = arr[::-1]
-    elif presortedness == 0.5:
-        np.random.shuffle(arr)
-    return arr
+def create_array(size, presortedness, seed=None):
+    return generate_array(size, presortedness, seed=seed, as_array=True)
 
 def measure_sorting_time(sort_function, arr):
-    start_time = time.time()
-    sort_function(arr.copy())
-    end_time = time.time()
-    return end_time - start_time
+    return measure_time(sort_function, arr)  # Copies arr outside the timed region
 
 # Parameters
 start = 0
@@ -90,44 +32,33 @@ stop = 1000
 steps = 100
 presortedness_values = [0, 0.5, 1]
 reps = 5
+workers = 1  # Number of worker processes
+seed = 0  # Seed for the generated arrays, so cached cells can be reused
+results_path = "results.jsonl"  # Finished cells are kept here; re-runs only compute what changed
+output = None  # Report path(s), e.g. ["all.png", "all.csv"]; None shows the plot (or saves it when headless)
 
-# Running the tests
 sizes = range(start, stop + 1, steps)
 sort_functions = {
     "Insertion Sort": insertion_sort,
+    "Binary Insertion Sort": binary_insertion_sort,
     "Merge Sort": merge_sort,
+    "Bottom-Up Merge Sort": merge_sort_bottom_up,
     "Heap Sort": heap_sort,
     "Quick Sort": quick_sort,
-    "Selection Sort": selection_sort
+    "Selection Sort": selection_sort,
+    "Hybrid Sort": hybrid_sort
 }
 
-# Store results
-results = {name: {ps: [] for ps in presortedness_values} for name in sort_functions.keys()}
-
-for size in sizes:
-    for ps in presortedness_values:
-        for _ in range(reps):
-            arr = create_array(size, ps)
-            for name, sort_function in sort_functions.items():
-                time_taken = measure_sorting_time(sort_function, arr)
-                results[name][ps].append(time_taken)
-
-# Averaging the results
-avg_results = {name: {ps: [] for ps in presortedness_values} for name in sort_functions.keys()}
-for name, presortedness_data in results.items():
-    for ps, times in presortedness_data.items():
-        avg_results[name][ps] = [np.mean(times[i:i+reps]) for i in range(0, len(times), reps)]
-
-# Plotting the results
-plt.figure(figsize=(15, 10))
-
-for name, presortedness_data in avg_results.items():
-    for ps, avg_times in presortedness_data.items():
-        plt.plot(sizes, avg_times, label=f"{name}, Presortedness={ps}")
-
-plt.xlabel('Array Size')
-plt.ylabel('Average Time (seconds)')
-plt.title('Sorting Algorithms Performance')
-plt.legend()
-plt.grid(True)
-plt.show()
+if __name__ == "__main__":
+    # Running the tests; every algorithm sees the same seeded inputs
+    store = ResultStore(results_path)
+    avg_results = {name: run_grid(sort_function, create_array, measure_sorting_time, sizes, presortedness_values, reps, workers,
+                                  seed=seed, store=store)
+                   for name, sort_function in sort_functions.items()}
+
+    # Plotting the results
+    series = {f"{name}, Presortedness={ps}": avg_times
+              for name, presortedness_data in avg_results.items()
+              for ps, avg_times in presortedness_data.items()}
+    plot_results(sizes, series, 'Sorting Algorithms Performance', ylabel='Average Time (seconds)', label="{}",
+                 output=output, figsize=(15, 10))
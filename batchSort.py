@@ -0,0 +1,186 @@
+import numpy as np
+from functools import lru_cache
+
+NETWORK_MAX_WIDTH = 64  # Wider rows are sorted one at a time by a kernel
+NETWORK_CHUNK = 2048  # Rows sorted together, so the transposed chunk stays in cache
+
+@lru_cache(maxsize=None)
+def network_layers(width):
+    """
+    Builds Batcher's odd-even merge sorting network for `width` wires.
+
+    The network for the next power of two is generated layer by layer and comparators
+    touching the wires past `width` are dropped: padding with +inf, such a comparator
+    never moves a finite value, so what is left still sorts.
+
+    :param width: The number of elements per row.
+    :return: A tuple of layers, each a pair of index arrays (lo, hi) of disjoint
+             comparators that put the smaller value at lo.
+    """
+    n = 1 << max(width - 1, 0).bit_length()
+    layers = []
+    p = 1
+    while p < n:
+        k = p
+        while k >= 1:
+            pairs = [(i + j, i + j + k)
+                     for j in range(k % p, n - k, 2 * k)
+                     for i in range(min(k, n - j - k))
+                     if (i + j) // (2 * p) == (i + j + k) // (2 * p) and i + j + k < width]
+            if pairs:
+                lo, hi = zip(*pairs)
+                layers.append((np.array(lo, dtype=np.intp), np.array(hi, dtype=np.intp)))
+            k //= 2
+        p *= 2
+    return tuple(layers)
+
+def _network_sort(block):
+    """
+    Sorts every row of a 2-D array in place with the sorting network for its width.
+
+    Chunks of rows are transposed so each wire is one contiguous vector; every layer is
+    then two vectorized compare-exchanges, np.minimum and np.maximum, across every row
+    of the chunk at once. NaNs are not supported.
+    """
+    layers = network_layers(block.shape[1])
+    for start in range(0, block.shape[0], NETWORK_CHUNK):
+        chunk = block[start:start + NETWORK_CHUNK]
+        columns = np.ascontiguousarray(chunk.T)
+        for lo, hi in layers:
+            a, b = columns[lo], columns[hi]
+            columns[lo] = np.minimum(a, b)
+            columns[hi] = np.maximum(a, b)
+        chunk[...] = columns.T
+
+def _kernel_sort(rows, kernel):
+    """
+    Sorts each row with a 1-D sort kernel; rows are numpy views, so the kernels write in place.
+    """
+    for row in rows:
+        result = kernel(row)
+        if result is not None:
+            row[:] = result  # Out-of-place sorts return a sorted copy
+
+def sort_rows(matrix, kernel=None, network_max_width=NETWORK_MAX_WIDTH):
+    """
+    Sorts every row of a 2-D numpy array in place.
+
+    Rows up to network_max_width wide are sorted all at once by a vectorized sorting
+    network, so the per-call interpreter overhead is paid once per comparator layer
+    instead of once per row. Wider rows are sorted one by one with kernel.
+
+    :param matrix: A 2-D numpy array of numbers.
+    :param kernel: The 1-D sort for wide rows (defaults to quick_sort).
+    :param network_max_width: The widest rows sorted by the network; 0 sorts every row with kernel.
+    :return: matrix.
+    """
+    if matrix.ndim != 2:
+        raise ValueError(f"sort_rows needs a 2-D array, not {matrix.ndim}-D")
+    rows, width = matrix.shape
+    if rows == 0 or width < 2:
+        return matrix
+    if width <= network_max_width:
+        _network_sort(matrix)
+    else:
+        if kernel is None:
+            from quickSort import quick_sort
+            kernel = quick_sort
+        _kernel_sort(matrix, kernel)
+    return matrix
+
+def sort_ragged(values, offsets, kernel=None, network_max_width=NETWORK_MAX_WIDTH):
+    """
+    Sorts every segment values[offsets[i]:offsets[i + 1]] of a ragged array in place.
+
+    Segments are grouped by length; each group of narrow segments is gathered into a
+    2-D block, sorted by the sorting network and scattered back, and wider segments are
+    sorted one by one with kernel.
+
+    :param values: A 1-D numpy array holding the segments end to end.
+    :param offsets: The start of every segment followed by the end of the last one.
+    :param kernel: The 1-D sort for wide segments (defaults to quick_sort).
+    :param network_max_width: The longest segments sorted by the network.
+    :return: values.
+    """
+    offsets = np.asarray(offsets, dtype=np.intp)
+    if values.ndim != 1 or offsets.ndim != 1:
+        raise ValueError("sort_ragged needs 1-D values and offsets")
+    if len(offsets) and (offsets[0] < 0 or offsets[-1] > len(values) or np.any(np.diff(offsets) < 0)):
+        raise ValueError("offsets must be non-decreasing and within values")
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    for width in np.unique(lengths).tolist():
+        if width < 2:
+            continue
+        group = starts[lengths == width]
+        if width <= network_max_width:
+            index = group[:, None] + np.arange(width)
+            block = values[index]
+            _network_sort(block)
+            values[index] = block
+        else:
+            if kernel is None:
+                from quickSort import quick_sort
+                kernel = quick_sort
+            _kernel_sort((values[start:start + width] for start in group.tolist()), kernel)
+    return values
+
+def generate_batch(rows, width, presortedness=0.5, seed=None):
+    """
+    Generates a rows x width matrix of int64 with the "presorted" disorder model in every row.
+
+    Like workload.generate_array, presortedness 0 gives descending rows, 1 sorted rows,
+    and anything between random rows whose first width * presortedness elements are
+    sorted, but all rows are generated at once.
+
+    :return: A C-contiguous 2-D numpy array.
+    """
+    rng = np.random.default_rng(seed)
+    if presortedness == 0:
+        return np.tile(np.arange(width - 1, -1, -1, dtype=np.int64), (rows, 1))
+    if presortedness == 1:
+        return np.tile(np.arange(width, dtype=np.int64), (rows, 1))
+    matrix = rng.permuted(np.tile(np.arange(width, dtype=np.int64), (rows, 1)), axis=1)
+    presorted_elements = int(width * presortedness)
+    matrix[:, :presorted_elements].sort(axis=1)
+    return matrix
+
+def run_tests(widths, row_counts, rep, presortedness=0.5, seed=None, plot=True, output=None):
+    """
+    Compares the sorting network with per-row insertion sort and numpy's row sort, in rows per second.
+
+    :param widths: The row widths to test.
+    :param row_counts: The numbers of rows to test.
+    :param rep: The number of repetitions for each test.
+    :param presortedness: The presortedness of every row.
+    :param seed: A seed that makes the generated matrices reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary of the rows sorted per second by each method and row count, for each width.
+    """
+    from timing import measure_time
+    from insertionSort import insertion_sort
+    from report import plot_results
+
+    methods = {"sorting network": sort_rows,
+               "insertion_sort per row": lambda m: sort_rows(m, insertion_sort, network_max_width=0),
+               "numpy sort": lambda m: m.sort(axis=1)}
+    results = {f"{name}, {rows} rows": [] for rows in row_counts for name in methods}
+    for i, width in enumerate(widths):
+        for rows in row_counts:
+            matrix = generate_batch(rows, width, presortedness, seed=None if seed is None else [seed, i, rows])
+            for name, method in methods.items():
+                avg_time = sum(measure_time(method, matrix) for _ in range(rep)) / rep
+                results[f"{name}, {rows} rows"].append(rows / avg_time)
+                print(f'Width: {width}, Rows: {rows}, {name}, Rows/s: {rows / avg_time:.0f}')
+
+    if plot:
+        plot_results(widths, results, 'Batched Sorting of Small Arrays', xlabel='Row Width', ylabel='Rows per second',
+                     label="{}", output=output, index_name="width")
+    return results
+
+if __name__ == "__main__":
+    widths = [8, 16, 32, 64, 128]  # Row widths to test
+    row_counts = [1000, 100000]  # Numbers of rows to test
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(widths, row_counts, rep)  # Run tests
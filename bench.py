@@ -0,0 +1,288 @@
+import os
+import sys
+import time
+import argparse
+from functools import partial
+import registry
+from workload import MODELS, generate_array
+from buffers import to_backing
+from batchSort import generate_batch
+from regressionGate import add_arguments as add_gate_arguments
+
+PEAK_COLUMN = "peak memory (bytes)"
+COUNT_COLUMNS = ("comparisons", "swaps", "moves")  # Operation counts tabled by --count
+
+def _generate(model, backing, size, presortedness, seed=None):
+    """
+    Generates one input for the grid; a module-level function so pool workers can unpickle it.
+    """
+    return to_backing(generate_array(size, presortedness, model=model, seed=seed), backing)
+
+def _generate_batch(rows, size, presortedness, seed=None):
+    """
+    Generates one input of a batch run: rows arrays of width size, as a 2-D numpy array.
+    """
+    return generate_batch(rows, size, presortedness, seed=seed)
+
+def parse_sizes(text):
+    """
+    Parses a size range.
+
+    :param text: Either "start:stop:steps", which splits the range into steps intervals
+                 like run_tests does, or a comma-separated list of sizes.
+    :return: A list of sizes.
+    """
+    if ":" in text:
+        start, stop, steps = (int(part) for part in text.split(":"))
+        return list(range(start, stop + 1, max(1, (stop - start) // steps)))
+    return [int(size) for size in text.split(",") if size]
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the registered sorting algorithms.")
+    parser.add_argument("algorithms", nargs="*", help="Algorithms to run (default: all that match the trait filters)")
+    parser.add_argument("--list", action="store_true", help="List the registered algorithms and their traits")
+    parser.add_argument("--sizes", type=parse_sizes, default=parse_sizes("0:1000:10"),
+                        help='"start:stop:steps" or a comma-separated list (default: 0:1000:10)')
+    parser.add_argument("--presortedness", type=float, nargs="+", default=[0, 0.5, 1], help="Presortedness levels")
+    parser.add_argument("--model", choices=MODELS, default="presorted", help="Disorder model of the inputs")
+    parser.add_argument("--backing", choices=("list", "array", "numpy", "memoryview"), default="list",
+                        help="Storage of the inputs")
+    parser.add_argument("--rep", type=int, default=5, help="Repetitions per cell")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated inputs")
+    parser.add_argument("--store", help="JSONL result store; cells already in it are not run again")
+    parser.add_argument("--output", nargs="+", help="Report files: .png/.svg/.pdf for the plot, .csv for the table")
+    parser.add_argument("--no-plot", action="store_true", help="Only print the results")
+    parser.add_argument("--route-integers", action="store_true",
+                        help="Send integer inputs to counting or radix sort when the key range makes that worthwhile")
+    parser.add_argument("--cell-timeout", type=float, metavar="SECONDS", help="Kill any cell that runs longer than this")
+    parser.add_argument("--budget", type=float, metavar="SECONDS",
+                        help="Wall-clock budget of the whole run; cells predicted to overrun it are skipped")
+    parser.add_argument("--batch-rows", type=int, nargs="+", metavar="ROWS",
+                        help="Sort this many arrays per call with batchSort, the sizes being their widths; "
+                             "reports rows sorted per second")
+    parser.add_argument("--memory", action="store_true",
+                        help="Also trace every cell's peak memory (and with --count its allocations); plotted and tabled next to time")
+    parser.add_argument("--count", action="store_true",
+                        help="Also count every cell's comparisons, swaps and moves; tabled next to time")
+    parser.add_argument("--hot-spots", type=int, default=0, metavar="N",
+                        help="Snapshot each algorithm at the largest size and print its N top allocation sites")
+    parser.add_argument("--baseline", metavar="STORE",
+                        help="Result store of a baseline run; exit with status 1 if a cell of this run is slower "
+                             "or has no baseline, or if no cell could be compared")
+    add_gate_arguments(parser)
+    parser.add_argument("--fit", action="store_true", help="Fit every curve to the complexity models")
+    parser.add_argument("--adaptive-sizes", type=float, metavar="SECONDS",
+                        help="Pick sizes geometrically until the fit converges, within this total budget")
+    parser.add_argument("--start", type=int, default=1000, help="First size of an adaptive-sizes run")
+    parser.add_argument("--factor", type=float, default=2, help="Size growth factor of an adaptive-sizes run")
+    parser.add_argument("--extrapolate", type=int, nargs="+", default=[], metavar="N",
+                        help="Sizes to predict the time of from the best fit")
+    for trait in ("stable", "in_place", "adaptive"):
+        parser.add_argument(f"--{trait.replace('_', '-')}", dest=trait, choices=("yes", "no"),
+                            help=f"Only algorithms that are (yes) or are not (no) {trait.replace('_', '-')}")
+    return parser
+
+def list_algorithms(algorithms):
+    print(f"{'name':<26}{'in-place':<10}{'stable':<8}{'adaptive':<10}{'best':<9}{'average':<9}{'worst':<9}space")
+    for a in algorithms:
+        print(f"{a.name:<26}{'yes' if a.in_place else 'no':<10}{'yes' if a.stable else 'no':<8}"
+              f"{'yes' if a.adaptive else 'no':<10}{a.best:<9}{a.average:<9}{a.worst:<9}{a.space}")
+
+def _run_adaptive(args, entries, generate, measure, store):
+    from complexityFit import adaptive_fit, print_fits
+    budget = args.adaptive_sizes / (len(entries) * len(args.presortedness))  # Split the budget over every curve
+    results = {}
+    for algorithm, name, func in entries:
+        for ps in args.presortedness:
+            print(f"{name}, Presortedness={ps}:")
+            run = adaptive_fit(func, generate, measure, ps, args.rep, args.start, args.factor, budget,
+                               targets=args.extrapolate, seed=args.seed, store=store)
+            results[(name, ps)] = run
+            state = "converged" if run["converged"] else "not converged"
+            best = run["fits"][0]["model"] if run["fits"] else "-"
+            print(f"  {len(run['sizes'])} sizes up to {run['sizes'][-1]} in {run['seconds']:.1f} s, {state}; "
+                  f"best fit {best} (declared average {algorithm.average})")
+            print_fits(run["fits"])
+            for n, seconds in run["predictions"].items():
+                print(f"  predicted at {n}: {seconds:.4f} s")
+    return results
+
+def _run_batch(args, entries, store):
+    """
+    Times every algorithm as the per-row kernel of batchSort.sort_rows, and the sorting
+    network itself, over a rows x width grid; the sizes are the widths.
+
+    :return: A dictionary of rows sorted per second for each "name, rows" and presortedness.
+    """
+    from batchSort import sort_rows
+    from gridRunner import run_grid
+    from timing import measure_time
+    from report import plot_results
+
+    entries = [(name, partial(sort_rows, kernel=func, network_max_width=0)) for _, name, func in entries]
+    entries.insert(0, ("sorting_network", sort_rows))
+    results = {}
+    for rows in args.batch_rows:
+        generate = partial(_generate_batch, rows)
+        for name, func in entries:
+            print(f"{name}, {rows} rows:")
+            times = run_grid(func, generate, measure_time, args.sizes, args.presortedness, args.rep,
+                             args.workers, seed=args.seed, store=store)
+            results[f"{name}, {rows} rows"] = {ps: [rows / t if t else None for t in by_size]
+                                              for ps, by_size in times.items()}
+    if not args.no_plot:
+        series = {f"{name}, Presortedness={ps}": rates
+                  for name, by_level in results.items() for ps, rates in by_level.items()}
+        plot_results(args.sizes, series, "Batched Sorting (rows per second)", xlabel="Row Width",
+                     ylabel="Rows per second", label="{}", output=args.output, index_name="width")
+    return results
+
+def _report_columns(args, series, extra, title):
+    """
+    Plots time, and peak memory as a second figure if it was traced, and writes one table
+    with the memory and operation-count columns of every series next to its time column.
+
+    :param extra: A dictionary of column name, e.g. "peak memory (bytes)", -> series -> values.
+    """
+    from report import plot_results, split_outputs, write_csv
+
+    tables, figures = split_outputs(args.output)
+    for path in tables:
+        columns = {}
+        for key, times in series.items():
+            columns[f"{key}, time (s)"] = times
+            for column, values in extra.items():
+                columns[f"{key}, {column}"] = values[key]
+        write_csv(path, "size", args.sizes, columns)
+        print(f"Wrote {path}")
+    plot_results(args.sizes, series, title, label="{}", output=figures if args.output else None)
+    peaks = extra.get(PEAK_COLUMN)
+    if peaks:
+        memory_figures = [f"{stem}-memory{ext}" for stem, ext in map(os.path.splitext, figures)]
+        plot_results(args.sizes, peaks, f"Peak Memory ({args.model}, {args.backing})", ylabel="Peak Memory (bytes)",
+                     label="{}", output=memory_figures if args.output else None)
+
+def main(argv=None):
+    """
+    Runs the benchmark grid for the selected algorithms in one process.
+
+    :param argv: The command-line arguments (defaults to sys.argv[1:]).
+    :return: A dictionary of run_grid results for each algorithm name.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    traits = {trait: getattr(args, trait) == "yes" for trait in ("stable", "in_place", "adaptive") if getattr(args, trait)}
+    try:
+        algorithms = registry.select(args.algorithms, **traits)
+    except KeyError as e:
+        parser.error(e.args[0])
+    if args.list:
+        list_algorithms(algorithms)
+        return {}
+    if not algorithms:
+        sys.exit("No algorithm matches the selection")
+
+    from gridRunner import run_grid
+    from timing import measure_time
+    from resultStore import ResultStore
+    from report import plot_results
+    from memoryProfile import print_memory
+    from instrument import print_operations
+
+    entries = [(algorithm, algorithm.name, algorithm.func) for algorithm in algorithms]
+    if args.route_integers:
+        from radixSort import integer_sort
+        entries = [(algorithm, f"{name}+integer", partial(integer_sort, fallback=func))  # Picklable for pool workers
+                   for algorithm, name, func in entries]
+    if args.baseline and not args.store:
+        parser.error("--baseline compares the cells written to --store; give one")
+    if args.baseline and (args.batch_rows or args.adaptive_sizes):
+        parser.error("--baseline gates the plain grid; drop --batch-rows and --adaptive-sizes")
+    store = ResultStore(args.store) if args.store else None
+    if args.batch_rows:
+        return _run_batch(args, entries, store)
+    if args.memory and (args.cell_timeout or args.budget or args.adaptive_sizes):
+        parser.error("--memory runs on the plain grid; drop --cell-timeout, --budget and --adaptive-sizes")
+    if args.count and (args.cell_timeout or args.budget or args.adaptive_sizes):
+        parser.error("--count runs on the plain grid; drop --cell-timeout, --budget and --adaptive-sizes")
+    generate = partial(_generate, args.model, args.backing)
+    if args.adaptive_sizes:
+        return _run_adaptive(args, entries, generate, measure_time, store)
+    results = {}
+    extra = {}  # Column name -> series -> values, tabled next to time
+    missing = {}
+    if args.cell_timeout or args.budget:
+        from scheduler import run_scheduled
+        began = time.perf_counter()
+        for i, (_, name, func) in enumerate(entries):
+            print(f"{name}:")
+            budget = None
+            if args.budget:
+                budget = (args.budget - (time.perf_counter() - began)) / (len(entries) - i)  # Share what is left
+            results[name], status = run_scheduled(func, generate, measure_time, args.sizes, args.presortedness,
+                                                  args.rep, args.cell_timeout, budget, seed=args.seed, store=store)
+            for (size, ps), cell_status in status.items():
+                if cell_status != "ok":
+                    missing.setdefault(f"{name}, Presortedness={ps}", {})[size] = cell_status
+    else:
+        for _, name, func in entries:
+            print(f"{name}:")
+            cells = {} if args.memory else None
+            counts = {} if args.count else None
+            results[name] = run_grid(func, generate, measure_time, args.sizes, args.presortedness, args.rep,
+                                     args.workers, seed=args.seed, operations=counts, memory=cells, store=store)
+            if cells:
+                print_memory(cells)
+                extra.setdefault(PEAK_COLUMN, {}).update({f"{name}, Presortedness={ps}": [
+                    cells[(size, ps)]["peak"] for size in args.sizes] for ps in args.presortedness})
+            if counts:
+                print_operations(counts)
+                for field in COUNT_COLUMNS:
+                    extra.setdefault(field, {}).update({f"{name}, Presortedness={ps}": [
+                        counts[(size, ps)][field] for size in args.sizes] for ps in args.presortedness})
+
+    if args.hot_spots:
+        from memoryProfile import hot_spots, print_hot_spots
+        size, ps = max(args.sizes), args.presortedness[0]
+        for _, name, func in entries:
+            print(f"{name}, Size: {size}, Presortedness: {ps}, allocation hot spots:")
+            print_hot_spots(hot_spots(func, generate(size, ps, seed=args.seed), args.hot_spots))
+
+    if args.fit or args.extrapolate:
+        from complexityFit import fit, predict, print_fits
+        for name, by_level in results.items():
+            for ps, times in by_level.items():
+                measured = [(size, t) for size, t in zip(args.sizes, times) if t is not None]
+                if len(measured) < 2:
+                    continue
+                fits = fit(*zip(*measured))
+                print(f"{name}, Presortedness={ps}: best fit {fits[0]['model']}")
+                print_fits(fits)
+                for n in args.extrapolate:
+                    print(f"  predicted at {n}: {predict(fits[0], n):.4f} s")
+
+    if not args.no_plot:
+        series = {f"{name}, Presortedness={ps}": times
+                  for name, by_level in results.items() for ps, times in by_level.items()}
+        title = f"Sorting Algorithms Performance ({args.model}, {args.backing})"
+        if not extra:
+            plot_results(args.sizes, series, title, label="{}", output=args.output, missing=missing)
+        else:
+            _report_columns(args, series, extra, title)
+
+    if args.baseline:
+        from regressionGate import gate
+        print(f"Against baseline {args.baseline}:")
+        current = [store.get(store.key(func, generate, measure_time, size, ps, args.seed))
+                   for _, _, func in entries for size in args.sizes for ps in args.presortedness]
+        failures = gate(ResultStore(args.baseline), [record for record in current if record], args)
+        unfinished = current.count(None)  # Timed out or skipped, so never written to the store
+        if unfinished:
+            print(f"FAILED: {unfinished} requested cells did not finish and were not compared")
+        if failures or unfinished:
+            sys.exit(f"Performance gate failed against {args.baseline}")
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import array
+from copy import copy
+
+def as_buffer(arr):
+    """
+    Returns a view of arr that the sort kernels can index without boxing.
+
+    Lists, array.array, bytearray and memoryview already read and write plain Python
+    values and are returned unchanged. Other objects exporting the buffer protocol,
+    such as numpy arrays, are wrapped in a memoryview over the same memory, so the
+    kernels read and write the raw buffer in place instead of creating a numpy
+    scalar per element access. Anything else is returned unchanged.
+
+    :param arr: The array to be sorted.
+    :return: arr itself or a memoryview sharing its memory.
+    """
+    if isinstance(arr, (list, array.array, bytearray, memoryview)):
+        return arr
+    try:
+        view = memoryview(arr)
+        view[:1].tolist()  # Fails for formats memoryview cannot index, e.g. non-native byte order
+    except (TypeError, ValueError, NotImplementedError):
+        return arr
+    if view.ndim != 1:
+        return arr
+    return view
+
+def copy_buffer(arr):
+    """
+    Returns a copy of arr of the same kind, for kernels that need an auxiliary buffer.
+
+    :param arr: A list, array.array, bytearray, memoryview or numpy array.
+    :return: An independent copy with the same element type.
+    """
+    if isinstance(arr, memoryview):
+        return memoryview(bytearray(arr)).cast(arr.format)  # Copy the bytes, keep the item format
+    return copy(arr)
+
+def slice_copy(arr, lo, hi):
+    """
+    Returns an independent copy of arr[lo:hi].
+
+    List, array.array and bytearray slices are already copies; memoryview and
+    numpy slices are views of the same memory and have to be copied.
+    """
+    part = arr[lo:hi]
+    if isinstance(arr, (list, array.array, bytearray)):
+        return part
+    return copy_buffer(part)
+
+def to_backing(values, backing):
+    """
+    Converts a list of ints to the given storage, for comparing the same sort on different backings.
+
+    :param values: The list of integers.
+    :param backing: One of "list", "array" (array.array of int64), "numpy" or "memoryview".
+    :return: The values in the requested storage.
+    """
+    if backing == "list":
+        return list(values)
+    if backing == "array":
+        return array.array("q", values)
+    if backing == "numpy":
+        import numpy as np  # Only numpy backings need it
+        return np.array(values, dtype=np.int64)
+    if backing == "memoryview":
+        return memoryview(array.array("q", values))
+    raise ValueError(f"Unknown backing {backing!r}")
@@ -0,0 +1,131 @@
+import math
+import time
+import numpy as np
+
+MODELS = {
+    "1": lambda n: np.ones_like(n),
+    "log n": lambda n: np.log2(n),
+    "n": lambda n: n,
+    "n log n": lambda n: n * np.log2(n),
+    "n^4/3": lambda n: n ** (4 / 3),
+    "n^2": lambda n: n ** 2,
+    "n^3": lambda n: n ** 3,
+}
+
+def _fit_model(n, t, f):
+    """
+    Fits t ~ a * f(n) + c, minimizing the relative error so small sizes count as much as large ones.
+
+    :return: The constants (a, c).
+    """
+    x = f(n)
+    design = np.column_stack([x / t, 1 / t])  # Divide every row by t to weight by relative error
+    (a, c), *_ = np.linalg.lstsq(design, np.ones_like(t), rcond=None)
+    if c < 0 or a < 0:
+        a, c = float(np.sum(x / t) / np.sum((x / t) ** 2)), 0.0  # No negative overhead: fit through the origin
+    return float(a), float(c)
+
+def fit(sizes, times, models=None):
+    """
+    Fits timings to every complexity model and ranks the models.
+
+    Each model is fitted as time = a * f(n) + c, where c absorbs the constant per-call
+    overhead. The fits are scored by their relative RMSE and by R^2, and sorted best first.
+
+    :param sizes: The measured sizes.
+    :param times: The measured times in seconds.
+    :param models: A dictionary of name -> f(n) taking a numpy array; defaults to MODELS.
+                   Custom models, e.g. {"n^1.5": lambda n: n ** 1.5}, are fitted the same way.
+    :return: A list of dictionaries with the model name, a, c, rel_rmse and r2.
+    """
+    n = np.asarray(sizes, dtype=np.float64)
+    t = np.asarray(times, dtype=np.float64)
+    keep = (n > 1) & (t > 0)  # log n and relative errors need n > 1 and t > 0
+    n, t = n[keep], t[keep]
+    if len(n) < 2:
+        raise ValueError("At least two sizes above 1 with positive times are needed")
+    fits = []
+    for name, f in (models or MODELS).items():
+        a, c = _fit_model(n, t, f)
+        predicted = a * f(n) + c
+        rel_rmse = float(np.sqrt(np.mean(((predicted - t) / t) ** 2)))
+        total = np.sum((t - t.mean()) ** 2)
+        r2 = float(1 - np.sum((t - predicted) ** 2) / total) if total else 1.0
+        fits.append({"model": name, "a": a, "c": c, "rel_rmse": rel_rmse, "r2": r2, "f": f})
+    fits.sort(key=lambda result: result["rel_rmse"])
+    return fits
+
+def predict(result, n):
+    """
+    :param result: One fit from fit().
+    :param n: A size, or a list of sizes.
+    :return: The predicted time in seconds.
+    """
+    return result["a"] * result["f"](np.asarray(n, dtype=np.float64)) + result["c"]
+
+def adaptive_fit(sort_func, generate, measure, presortedness, rep, start=1000, factor=2, budget=60, tolerance=0.1,
+                 min_points=4, patience=2, max_size=None, models=None, targets=(), seed=None, store=None):
+    """
+    Measures geometrically growing sizes until the complexity fit converges or the budget runs out.
+
+    After each size the models are refitted. The fit has converged once the best model
+    of the previous fit has predicted the next `patience` points to within tolerance
+    without another model taking its place. The next size is skipped if the best fit predicts it would overrun the
+    remaining budget.
+
+    :param sort_func: The sort function to measure.
+    :param generate: The array generator, called as generate(size, presortedness, seed=seed).
+    :param measure: The timing function, called as measure(sort_func, arr).
+    :param presortedness: The presortedness level to measure at.
+    :param rep: The number of repetitions for each size.
+    :param start: The first size.
+    :param factor: The growth factor between sizes.
+    :param budget: The wall-clock budget in seconds.
+    :param tolerance: The relative prediction error that counts as converged.
+    :param min_points: The number of sizes measured before convergence is checked.
+    :param patience: The number of consecutive good predictions needed to converge.
+    :param max_size: The largest size to measure.
+    :param models: The models to fit; see fit().
+    :param targets: Sizes too large to measure whose times are extrapolated from the best fit.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param store: A ResultStore for the measured cells.
+    :return: A dictionary with the sizes, times, fits (best first), whether the fit converged,
+             the seconds spent and the predicted time at each target.
+    """
+    from gridRunner import run_grid
+
+    began = time.perf_counter()
+    sizes, times, fits = [], [], []
+    converged = False
+    streak = 0
+    size = start
+    while max_size is None or size <= max_size:
+        elapsed = time.perf_counter() - began
+        if fits and predict(fits[0], size) * (rep + 1) > budget - elapsed:
+            break  # rep timed calls plus calibration would overrun the budget
+        result = run_grid(sort_func, generate, measure, [size], [presortedness], rep, seed=seed, store=store)
+        sizes.append(size)
+        times.append(result[presortedness][0])
+        if len(sizes) >= 2:
+            previous = fits[0] if fits else None
+            fits = fit(sizes, times, models)
+            if previous and previous["model"] == fits[0]["model"] \
+                    and abs(predict(previous, size) - times[-1]) <= tolerance * times[-1]:
+                streak += 1
+            else:
+                streak = 0
+            if len(sizes) >= min_points and streak >= patience:
+                converged = True
+                break
+        if time.perf_counter() - began >= budget:
+            break
+        size = max(size + 1, math.ceil(size * factor))
+    best = fits[0] if fits else None
+    return {"sizes": sizes, "times": times, "fits": fits, "converged": converged,
+            "seconds": time.perf_counter() - began,
+            "predictions": {n: float(predict(best, n)) for n in targets} if best else {}}
+
+def print_fits(fits, top=3):
+    for result in fits[:top]:
+        print(f'  {result["model"]:<8} a={result["a"]:.3e} c={result["c"]:.3e} '
+              f'rel RMSE={result["rel_rmse"]:.3f} R^2={result["r2"]:.4f}')
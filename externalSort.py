@@ -0,0 +1,196 @@
+import os
+import time
+import tempfile
+import numpy as np
+
+ITEM_BYTES = np.dtype(np.int64).itemsize
+
+def _open_output(path, length):
+    """
+    Opens a writable int64 memmap of the given length (numpy cannot map an empty file).
+    """
+    if length == 0:
+        open(path, "wb").close()
+        return np.empty(0, dtype=np.int64)
+    return np.memmap(path, dtype=np.int64, mode="w+", shape=(length,))
+
+def _form_runs(src, chunk_items, tmp_dir, sort_func):
+    """
+    Sorts memory-sized chunks of src and spills each one to its own run file.
+
+    :return: A list of (path, length) runs.
+    """
+    runs = []
+    for start in range(0, len(src), chunk_items):
+        chunk = np.array(src[start:start + chunk_items])  # Read one chunk into memory
+        if sort_func is None:
+            chunk.sort()
+        else:
+            sort_func(chunk)
+        fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+        os.close(fd)
+        chunk.tofile(path)  # Spill the sorted run
+        runs.append((path, len(chunk)))
+    return runs
+
+def _merge_runs(runs, out, block_items):
+    """
+    K-way merges sorted runs into out, holding at most one block per run in memory.
+
+    Every round takes, from each buffered block, the elements no greater than the
+    smallest last element among blocks whose run still has unread data. Everything
+    taken is guaranteed to precede anything not yet read, so it can be merged with
+    one stable sort and written out, and at least one block empties each round.
+    """
+    sources = [np.memmap(path, dtype=np.int64, mode="r", shape=(length,)) for path, length in runs]
+    buffers = [np.array(src[:block_items]) for src in sources]
+    positions = [len(buf) for buf in buffers]  # Next unread element of each run
+    written = 0
+    while any(len(buf) for buf in buffers):
+        pending = [buf[-1] for buf, src, pos in zip(buffers, sources, positions) if pos < len(src) and len(buf)]
+        bound = min(pending) if pending else None
+        pieces = []
+        for i, buf in enumerate(buffers):
+            cut = len(buf) if bound is None else np.searchsorted(buf, bound, side="right")
+            pieces.append(buf[:cut])
+            buffers[i] = buf[cut:]
+        merged = np.concatenate(pieces)
+        merged.sort(kind="stable")  # Pieces are concatenated in run order, so ties keep that order
+        out[written:written + len(merged)] = merged  # Write through the bounded output buffer
+        written += len(merged)
+
+        # Refill the blocks that ran dry
+        for i, src in enumerate(sources):
+            if not len(buffers[i]) and positions[i] < len(src):
+                buffers[i] = np.array(src[positions[i]:positions[i] + block_items])
+                positions[i] += len(buffers[i])
+    return written
+
+def external_sort(input_path, output_path, memory_limit=64 * 2 ** 20, fan_in=16, tmp_dir=None, sort_func=None):
+    """
+    Sorts a binary file of int64 values that may be larger than memory.
+
+    The input is read through np.memmap in chunks that fit the memory limit; each chunk
+    is sorted and spilled to a temporary run file. Runs are then k-way merged, up to
+    fan_in at a time with one bounded read buffer per run, in as many passes as it
+    takes to leave a single run, which is written to the output memmap.
+
+    :param input_path: The binary file of native-endian int64 values to sort.
+    :param output_path: The file the sorted values are written to.
+    :param memory_limit: The approximate number of bytes of array data to hold in memory.
+    :param fan_in: The maximum number of runs merged at once.
+    :param tmp_dir: The directory for run files (defaults to the system temp directory).
+    :param sort_func: Sorts a chunk in place, e.g. hybrid_sort; defaults to numpy's sort.
+    :return: A list of per-pass statistics with the bytes read and written by each pass.
+    """
+    length = os.path.getsize(input_path) // ITEM_BYTES
+    chunk_items = max(1, memory_limit // (2 * ITEM_BYTES))  # Leave room for the sort's own buffer
+    block_items = max(1, memory_limit // (2 * ITEM_BYTES * (fan_in + 1)))
+    stats = []
+
+    start = time.perf_counter()
+    src = np.memmap(input_path, dtype=np.int64, mode="r", shape=(length,)) if length else np.empty(0, dtype=np.int64)
+    runs = _form_runs(src, chunk_items, tmp_dir, sort_func)
+    del src
+    stats.append({"pass": 0, "runs": len(runs), "bytes_read": length * ITEM_BYTES,
+                  "bytes_written": length * ITEM_BYTES, "seconds": time.perf_counter() - start})
+
+    if not runs:
+        _open_output(output_path, 0)
+    try:
+        passes = 0
+        while len(runs) > 1 or passes == 0:
+            passes += 1
+            start = time.perf_counter()
+            final = len(runs) <= fan_in
+            next_runs = []
+            for group_start in range(0, len(runs), fan_in):
+                group = runs[group_start:group_start + fan_in]
+                group_length = sum(run_length for _, run_length in group)
+                if final:
+                    path = output_path
+                else:
+                    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+                    os.close(fd)
+                out = _open_output(path, group_length)
+                _merge_runs(group, out, block_items)
+                if isinstance(out, np.memmap):
+                    out.flush()
+                del out
+                for run_path, _ in group:
+                    os.remove(run_path)  # Each run is consumed by exactly one merge
+                next_runs.append((path, group_length))
+            stats.append({"pass": passes, "runs": len(next_runs), "bytes_read": length * ITEM_BYTES,
+                          "bytes_written": length * ITEM_BYTES, "seconds": time.perf_counter() - start})
+            runs = next_runs
+    finally:
+        for run_path, _ in runs:
+            if run_path != output_path and os.path.exists(run_path):
+                os.remove(run_path)
+    return stats
+
+def write_random_file(path, size, seed=None, chunk_items=2 ** 22):
+    """
+    Writes size random int64 values to path, a chunk at a time so the file can exceed memory.
+
+    :param path: The file to write.
+    :param size: The number of values to write.
+    :param seed: A seed that makes the file reproducible.
+    :param chunk_items: The number of values generated per chunk.
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, "wb") as f:
+        for start in range(0, size, chunk_items):
+            rng.integers(0, 2 ** 62, min(chunk_items, size - start), dtype=np.int64).tofile(f)
+
+def run_tests(values_start, values_stop, steps, memory_limit, rep, tmp_dir=None, seed=None, plot=True, output=None):
+    """
+    Runs tests on the external sort with varying input sizes and reports its throughput.
+
+    :param values_start: The starting size of the input, in megabytes.
+    :param values_stop: The maximum size of the input, in megabytes.
+    :param steps: The number of intervals to divide the size range.
+    :param memory_limit: The memory limit given to the sort, in bytes.
+    :param rep: The number of repetitions for each test.
+    :param tmp_dir: The directory for the input, output and run files.
+    :param seed: A seed that makes the generated inputs reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A list of the average throughput in MB/s for each size.
+    """
+    from report import plot_results
+
+    step_size = max(1, (values_stop - values_start) // steps)  # Calculate step size
+    sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
+    results = []
+
+    for size in sizes:
+        throughputs = []
+        for i in range(rep):
+            with tempfile.TemporaryDirectory(dir=tmp_dir) as work_dir:
+                input_path = os.path.join(work_dir, "input.bin")
+                output_path = os.path.join(work_dir, "output.bin")
+                write_random_file(input_path, size * 2 ** 20 // ITEM_BYTES, None if seed is None else [seed, size, i])
+                stats = external_sort(input_path, output_path, memory_limit, tmp_dir=work_dir)
+            seconds = sum(s["seconds"] for s in stats)
+            throughputs.append(size / seconds if seconds else 0.0)
+        avg_throughput = sum(throughputs) / rep  # Calculate average throughput
+        results.append(avg_throughput)
+        for s in stats:
+            print(f'  Pass {s["pass"]}: {s["runs"]} runs, read {s["bytes_read"] / 2 ** 20:.1f} MB, '
+                  f'wrote {s["bytes_written"] / 2 ** 20:.1f} MB in {s["seconds"]:.3f} s')
+        print(f'Size: {size} MB, Avg Throughput: {avg_throughput:.1f} MB/s')  # Print results
+
+    if plot:
+        plot_results(sizes, {memory_limit / 2 ** 20: results}, 'External Merge Sort Performance', 'Input Size (MB)',
+                     'Throughput (MB/s)', label="Memory limit = {:.0f} MB", output=output, index_name="size_mb")
+    return results
+
+if __name__ == "__main__":
+    values_start = 64  # Minimum input size in megabytes
+    values_stop = 1024  # Maximum input size in megabytes
+    steps = 4  # Number of intervals
+    memory_limit = 64 * 2 ** 20  # Bytes of array data the sort may hold in memory
+    rep = 1  # Number of repetitions for each test
+
+    run_tests(values_start, values_stop, steps, memory_limit, rep)  # Run tests
@@ -0,0 +1,176 @@
+import os
+import multiprocessing
+from functools import partial
+from workload import generate_array
+from buffers import to_backing
+from timing import summarize
+from instrument import count_operations, OPERATIONS
+from memoryProfile import measure_memory
+
+def _pin_worker(core_queue):
+    """
+    Pool initializer that pins the current worker process to a single core.
+
+    :param core_queue: A queue holding the core ids still to be handed out.
+    """
+    core = core_queue.get()
+    os.sched_setaffinity(0, {core})  # Keep this worker on one core so timings stay comparable
+
+def _run_cell(task):
+    """
+    Generates one input array and times a single sort on it.
+
+    :param task: A tuple (sort_func, generate, measure, size_index, size, presortedness, seed, count, profile).
+    :return: The size index, presortedness, time taken in seconds, and the operation counts
+             of an untimed instrumented run if count is set and the memory measured by an
+             untimed traced run if profile is set, on the same input.
+    """
+    sort_func, generate, measure, size_index, size, presortedness, seed, count, profile = task
+    arr = generate(size, presortedness, seed=seed)  # Generate array
+    time_taken = measure(sort_func, arr)  # measure sorts a copy
+    counts = None
+    if count:
+        try:
+            counts = count_operations(sort_func, arr)
+        except (TypeError, OSError):
+            counts = dict.fromkeys(OPERATIONS)  # No source to instrument, or elements it cannot wrap (e.g. radix sorts)
+    footprint = measure_memory(sort_func, arr, counts) if profile else None  # Traced after timing, so tracing never slows the timed run
+    return size_index, presortedness, time_taken, counts, footprint
+
+def _cell_seed(seed, size, presortedness, rep_index):
+    # Derived from the cell's values rather than its grid position, so a cell keeps its input
+    # (and its cache key) when the grid around it changes
+    return [seed, size, round(presortedness * 10 ** 6), rep_index]
+
+def _print_cell(size, presortedness, avg_time):
+    print(f'Size: {size}, Presortedness: {presortedness}, Avg Time: {avg_time:.5f}')  # Print results
+
+def run_grid(sort_func, generate, measure, sizes, presortedness_values, rep, workers=1, pin=True, on_cell=_print_cell, seed=None, summary=None,
+             operations=None, memory=None, store=None):
+    """
+    Times a sort function over every (size, presortedness, rep) cell of a benchmark grid.
+
+    With workers > 1 the cells are spread over a process pool and each
+    (size, presortedness) average is reported as soon as its last rep finishes.
+    With a store, every finished cell is written to disk at once and cells
+    already in the store are taken from it instead of being run again.
+
+    :param sort_func: The sort function to measure; it is called as measure(sort_func, arr).
+    :param generate: The array generator, called as generate(size, presortedness, seed=seed).
+    :param measure: The timing function, called as measure(sort_func, arr).
+    :param sizes: The array sizes to test.
+    :param presortedness_values: A list of presortedness levels to test.
+    :param rep: The number of repetitions for each test.
+    :param workers: The number of worker processes (1 runs in the current process).
+    :param pin: Whether to pin each worker to its own core.
+    :param on_cell: Called as on_cell(size, presortedness, avg_time) when a cell finishes.
+    :param seed: A seed that makes every generated array reproducible, whatever the worker count.
+    :param summary: If a dictionary is given, it is filled with the summarize() statistics
+                    (min, median, IQR, confidence interval) of every (size, presortedness) cell.
+    :param operations: If a dictionary is given, it is filled with the average operation counts
+                       (comparisons, swaps, moves, allocations, depth) of every cell; see count_operations.
+    :param memory: If a dictionary is given, it is filled with the average peak memory and auxiliary
+                   space ratio of every cell, and its allocation counts if operations are counted
+                   too; see measure_memory.
+    :param store: A ResultStore to read cached cells from and write finished cells to.
+    :return: A dictionary containing the average time taken for each presortedness level.
+    """
+    sizes = list(sizes)
+    keys = {}  # (size_index, presortedness) -> store key
+    cached = {}  # (size_index, presortedness) -> stored record
+    if store is not None:
+        for size_index, size in enumerate(sizes):
+            for presortedness in presortedness_values:
+                key = store.key(sort_func, generate, measure, size, presortedness, seed)
+                found = store.get(key)
+                if found and len(found["times"]) >= rep and (operations is None or found["operations"]) \
+                        and (memory is None or found.get("memory")):
+                    cached[(size_index, presortedness)] = found
+                keys[(size_index, presortedness)] = key
+    tasks = [(sort_func, generate, measure, size_index, size, presortedness,
+              None if seed is None else _cell_seed(seed, size, presortedness, rep_index),
+              operations is not None, memory is not None)
+             for size_index, size in enumerate(sizes)
+             for presortedness in presortedness_values
+             if (size_index, presortedness) not in cached
+             for rep_index in range(rep)]
+    times = {}  # (size_index, presortedness) -> list of rep times
+    counts = {}  # (size_index, presortedness) -> list of rep operation counts
+    footprints = {}  # (size_index, presortedness) -> list of rep memory measurements
+
+    def average(samples):
+        return {name: None if samples[0][name] is None else sum(s[name] for s in samples) / rep for name in samples[0]}
+
+    def finish(size_index, presortedness, cell_times, cell_operations, cell_memory):
+        if summary is not None:
+            summary[(sizes[size_index], presortedness)] = summarize(cell_times)
+        if operations is not None:
+            operations[(sizes[size_index], presortedness)] = cell_operations
+        if memory is not None:
+            memory[(sizes[size_index], presortedness)] = cell_memory
+        if on_cell is not None:
+            on_cell(sizes[size_index], presortedness, sum(cell_times) / rep)
+
+    def record(cell):
+        size_index, presortedness, time_taken, cell_counts, cell_footprint = cell
+        cell_times = times.setdefault((size_index, presortedness), [])
+        cell_times.append(time_taken)
+        if cell_counts is not None:
+            counts.setdefault((size_index, presortedness), []).append(cell_counts)
+        if cell_footprint is not None:
+            footprints.setdefault((size_index, presortedness), []).append(cell_footprint)
+        if len(cell_times) == rep:
+            cell_operations = average(counts[(size_index, presortedness)]) if operations is not None else None
+            cell_memory = average(footprints[(size_index, presortedness)]) if memory is not None else None
+            if store is not None:
+                store.put(keys[(size_index, presortedness)], cell_times, cell_operations, cell_memory)
+            finish(size_index, presortedness, cell_times, cell_operations, cell_memory)
+
+    for (size_index, presortedness), found in cached.items():
+        times[(size_index, presortedness)] = found["times"][:rep]
+        finish(size_index, presortedness, times[(size_index, presortedness)], found["operations"], found.get("memory"))
+
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            record(_run_cell(task))
+    else:
+        initializer, initargs = None, ()
+        if pin and hasattr(os, "sched_setaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+            core_queue = multiprocessing.Queue()
+            for i in range(workers):
+                core_queue.put(cores[i % len(cores)])  # Wrap around if there are more workers than cores
+            initializer, initargs = _pin_worker, (core_queue,)
+        with multiprocessing.Pool(workers, initializer, initargs) as pool:
+            for cell in pool.imap_unordered(_run_cell, tasks):
+                record(cell)
+
+    results = {level: [] for level in presortedness_values}  # Initialize results dictionary
+    for size_index in range(len(sizes)):
+        for presortedness in presortedness_values:
+            results[presortedness].append(sum(times[(size_index, presortedness)]) / rep)  # Store average time
+    return results
+
+def _generate_backed(backing, size, presortedness, seed=None):
+    return to_backing(generate_array(size, presortedness, seed=seed), backing)
+
+def run_backings(sort_func, measure, sizes, presortedness_values, rep, backings=("list", "numpy"), workers=1, seed=None):
+    """
+    Times the same sort on the same inputs held in different storage, e.g. a list
+    against a numpy array, to show what element boxing costs each kernel.
+
+    :param sort_func: The sort function to measure.
+    :param measure: The timing function, called as measure(sort_func, arr).
+    :param sizes: The array sizes to test.
+    :param presortedness_values: A list of presortedness levels to test.
+    :param rep: The number of repetitions for each test.
+    :param backings: The storages to compare: "list", "array", "numpy" or "memoryview".
+    :param workers: The number of worker processes.
+    :param seed: A seed for the inputs; every backing sorts the same values.
+    :return: A dictionary of run_grid results for each backing.
+    """
+    if seed is None:
+        seed = int.from_bytes(os.urandom(4), "little")  # Share one seed so the backings see identical inputs
+    return {backing: run_grid(sort_func, partial(_generate_backed, backing), measure, sizes,
+                              presortedness_values, rep, workers, seed=seed)
+            for backing in backings}
@@ -1,83 +1,147 @@
-import random
-import time
-import numpy as np
-import matplotlib.pyplot as plt
+from buffers import as_buffer
 
-def heapify(arr, n, i):
+def _max_child(arr, child, end, d):
+    """
+    Returns the position of the largest of the (up to d) children starting at child, with its value.
+    """
+    best_value = arr[child]
+    for position in range(child + 1, min(child + d, end)):
+        value = arr[position]
+        if best_value < value:
+            child, best_value = position, value
+    return child, best_value
+
+def heapify(arr, n, i, d=2, low=0):
     """
     Helper function to maintain the heap property of a subtree rooted at index i.
-    
+
+    The root value is lifted out once and larger children are moved up into the
+    hole it leaves, so each level costs one write instead of a swap.
+
     :param arr: The array representing the heap.
     :param n: The size of the heap.
     :param i: The root index of the subtree.
+    :param d: The number of children per node.
+    :param low: The index in arr at which the heap starts.
+    """
+    end = low + n
+    hole = low + i
+    item = arr[hole]
+    child = low + d * i + 1
+    while child < end:
+        if d == 2:
+            value = arr[child]
+            if child + 1 < end and value < arr[child + 1]:
+                child += 1  # Right child is the larger one
+                value = arr[child]
+        else:
+            child, value = _max_child(arr, child, end, d)
+        if not item < value:
+            break
+        arr[hole] = value  # Move the larger child up into the hole
+        hole = child
+        child = low + d * (hole - low) + 1
+    arr[hole] = item
+
+def heapify_min(arr, n, i, d=2, low=0):
     """
-    largest = i  # Initialize largest as root
-    left = 2 * i + 1  # Left child index
-    right = 2 * i + 2  # Right child index
+    The min-heap counterpart of heapify, for heaps that keep their smallest item at the root.
 
-    # If left child is larger than root
-    if left < n and arr[i] < arr[left]:
-        largest = left
+    :param arr: The array representing the heap.
+    :param n: The size of the heap.
+    :param i: The root index of the subtree.
+    :param d: The number of children per node.
+    :param low: The index in arr at which the heap starts.
+    """
+    end = low + n
+    hole = low + i
+    item = arr[hole]
+    child = low + d * i + 1
+    while child < end:
+        value = arr[child]
+        for position in range(child + 1, min(child + d, end)):
+            if arr[position] < value:
+                child, value = position, arr[position]  # Smallest child so far
+        if not value < item:
+            break
+        arr[hole] = value  # Move the smaller child up into the hole
+        hole = child
+        child = low + d * (hole - low) + 1
+    arr[hole] = item
 
-    # If right child is larger than the largest so far
-    if right < n and arr[largest] < arr[right]:
-        largest = right
+def sift_down_floyd(arr, n, i, d=2, low=0):
+    """
+    Floyd's bottom-up variant of heapify.
 
-    # If largest is not root
-    if largest != i:
-        arr[i], arr[largest] = arr[largest], arr[i]  # Swap
-        heapify(arr, n, largest)  # Recursively heapify the affected subtree
+    The hole is first walked all the way down to a leaf along the larger children
+    without comparing against the root value, which then climbs back up to its
+    place. Values moved to the root during heap sort come from the bottom of the
+    heap and rarely climb far, so this saves about one comparison per level.
 
-def heap_sort(arr):
+    :param arr: The array representing the heap.
+    :param n: The size of the heap.
+    :param i: The root index of the subtree.
+    :param d: The number of children per node.
+    :param low: The index in arr at which the heap starts.
+    """
+    end = low + n
+    start = hole = low + i
+    item = arr[hole]
+    child = low + d * i + 1
+    while child < end:
+        if d == 2:
+            value = arr[child]
+            if child + 1 < end and value < arr[child + 1]:
+                child += 1  # Right child is the larger one
+                value = arr[child]
+        else:
+            child, value = _max_child(arr, child, end, d)
+        arr[hole] = value  # Move the larger child up into the hole
+        hole = child
+        child = low + d * (hole - low) + 1
+
+    # Climb back up until the parent is no smaller than the item
+    while hole > start:
+        parent = low + (hole - low - 1) // d
+        value = arr[parent]
+        if not value < item:
+            break
+        arr[hole] = value
+        hole = parent
+    arr[hole] = item
+
+def heap_sort(arr, d=2, floyd=False, low=0, high=None):
     """
     Implementation of the heap sort algorithm.
-    
+
+    Sorts in place on any writable buffer, such as a list, array.array, memoryview or
+    numpy array; numpy arrays are read and written through a memoryview of their memory.
+    Wider heaps (d=4 or 8) are shallower, trading extra comparisons per level for
+    fewer levels and better locality on large arrays. Floyd's sift-down pays off
+    when comparisons are expensive; on plain ints the classic sift-down is faster.
+
     :param arr: The array to be sorted.
+    :param d: The number of children per heap node.
+    :param floyd: Whether to use Floyd's bottom-up sift-down while extracting.
+    :param low: The starting index of the array segment to be sorted.
+    :param high: The ending index of the array segment to be sorted (defaults to the last index).
     """
-    n = len(arr)
+    arr = as_buffer(arr)
+    if high is None:
+        high = len(arr) - 1
+    n = high - low + 1
+    sift = sift_down_floyd if floyd else heapify
 
     # Build a maxheap.
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i)
+    for i in range((n - 2) // d, -1, -1):
+        heapify(arr, n, i, d, low)
 
     # One by one extract elements
     for i in range(n - 1, 0, -1):
-        arr[i], arr[0] = arr[0], arr[i]  # Swap
-        heapify(arr, i, 0)  # Heapify the root element
+        arr[low + i], arr[low] = arr[low], arr[low + i]  # Swap
+        sift(arr, i, 0, d, low)  # Heapify the root element
 
-def generate_array(size, presortedness):
-    """
-    Generates an array of the given size with a specified level of presortedness.
-    
-    :param size: The size of the array to generate.
-    :param presortedness: The degree to which the array is presorted (0 to 1).
-    :return: A list of integers.
-    """
-    arr = list(range(size))  # Generate a list of integers from 0 to size-1
-    if presortedness == 0:
-        arr.reverse()  # Reverse the array for minimum presortedness
-    elif presortedness == 1:
-        pass  # Already sorted array for maximum presortedness
-    else:
-        random.shuffle(arr)  # Shuffle the array for random disorder
-        presorted_elements = int(size * presortedness)
-        arr[:presorted_elements] = sorted(arr[:presorted_elements])  # Partially sort based on presortedness
-    return arr
-
-def measure_time(func, *args):
-    """
-    Measures the time taken to execute a given function with the provided arguments.
-    
-    :param func: The function to measure.
-    :param args: The arguments to pass to the function.
-    :return: The time taken in seconds.
-    """
-    start = time.time()  # Start time
-    func(*args)  # Execute function
-    end = time.time()  # End time
-    return end - start  # Time taken
-
-def run_tests(values_start, values_stop, steps, presortedness_values, rep):
+def run_tests(values_start, values_stop, steps, presortedness_values, rep, workers=1, seed=None, store=None, plot=True, output=None):
     """
     Runs tests on the heap sort algorithm with varying array sizes and presortedness levels.
     
@@ -86,34 +150,26 @@ def run_tests(values_start, values_stop, steps, presortedness_values, rep):
     :param steps: The number of intervals to divide the size range.
     :param presortedness_values: A list of presortedness levels to test.
     :param rep: The number of repetitions for each test.
+    :param workers: The number of worker processes to spread the tests over.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param store: A ResultStore that keeps finished cells on disk and skips cells already run.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
     :return: A dictionary containing the average time taken for each presortedness level.
     """
-    results = {level: [] for level in presortedness_values}  # Initialize results dictionary
+    from gridRunner import run_grid  # Harness imports stay out of the kernels' import path
+    from workload import generate_array
+    from timing import measure_time
+    from report import plot_results
+
     step_size = (values_stop - values_start) // steps  # Calculate step size
     sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
     
-    for size in sizes:
-        for presortedness in presortedness_values:
-            times = []
-            for _ in range(rep):
-                arr = generate_array(size, presortedness)  # Generate array
-                arr_copy = arr[:]  # Copy array to avoid in-place sorting issues
-                time_taken = measure_time(heap_sort, arr_copy)  # Measure time taken to sort
-                times.append(time_taken)  # Record time
-            avg_time = sum(times) / rep  # Calculate average time
-            results[presortedness].append(avg_time)  # Store average time
-            print(f'Size: {size}, Presortedness: {presortedness}, Avg Time: {avg_time:.5f}')  # Print results
+    results = run_grid(heap_sort, generate_array, measure_time, sizes, presortedness_values, rep, workers, seed=seed, store=store)  # Time every cell
     
-    # Plot results
-    for presortedness, times in results.items():
-        plt.plot(sizes, times, label=f"Presortedness = {presortedness}")
-
-    plt.xlabel('Array Size')
-    plt.ylabel('Time (seconds)')
-    plt.title('Heap Sort Performance')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if plot:
+        plot_results(sizes, results, 'Heap Sort Performance', output=output)
+    return results
 
 if __name__ == "__main__":
     values_start = 0  # Minimum number of entries to sort
@@ -121,5 +177,6 @@ if __name__ == "__main__":
     steps = 100  # Number of intervals
     presortedness_values = [0, 0.5, 1]  # Presortedness levels to test
     rep = 5  # Number of repetitions for each test
+    workers = 1  # Number of worker processes
     
-    run_tests(values_start, values_stop, steps, presortedness_values, rep)  # Run tests
+    run_tests(values_start, values_stop, steps, presortedness_values, rep, workers)  # Run tests
@@ -0,0 +1,212 @@
+from bisect import bisect_left, bisect_right
+from insertionSort import binary_insertion_sort
+from buffers import as_buffer, slice_copy
+
+MIN_GALLOP = 7  # Consecutive wins by one run before the merge switches to galloping
+
+def _min_run(n):
+    """
+    Returns the minimum run length for an array of size n, between 32 and 64, chosen
+    so that n / min_run is a power of two or just below one and the merges stay balanced.
+    """
+    r = 0
+    while n >= 64:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+def _count_run(arr, lo, hi):
+    """
+    Finds the natural run starting at lo, reversing it in place if it is strictly descending.
+
+    :return: The end index (exclusive) of the run.
+    """
+    run_hi = lo + 1
+    if run_hi == hi:
+        return hi
+    if arr[run_hi] < arr[lo]:
+        # Strictly descending, so reversing it cannot reorder equal elements
+        while run_hi + 1 < hi and arr[run_hi + 1] < arr[run_hi]:
+            run_hi += 1
+        run_hi += 1
+        arr[lo:run_hi] = arr[lo:run_hi][::-1]
+    else:
+        while run_hi + 1 < hi and not arr[run_hi + 1] < arr[run_hi]:
+            run_hi += 1
+        run_hi += 1
+    return run_hi
+
+def _gallop_right(a, key, lo, hi):
+    """
+    Returns the first position in a[lo:hi] holding a value greater than key.
+
+    Probes lo, lo+1, lo+3, lo+7, ... to bracket the answer, then binary searches the bracket,
+    so finding a position p places in costs O(log p) rather than O(log(hi - lo)).
+    """
+    last, probe, step = lo, lo, 1
+    while probe < hi and not key < a[probe]:
+        last = probe + 1
+        probe += step
+        step *= 2
+    return bisect_right(a, key, last, min(probe, hi))
+
+def _gallop_left(a, key, lo, hi):
+    """
+    Returns the first position in a[lo:hi] holding a value not less than key.
+    """
+    last, probe, step = lo, lo, 1
+    while probe < hi and a[probe] < key:
+        last = probe + 1
+        probe += step
+        step *= 2
+    return bisect_left(a, key, last, min(probe, hi))
+
+def _merge(arr, lo, mid, hi):
+    """
+    Stable galloping merge of the adjacent sorted runs arr[lo:mid] and arr[mid:hi].
+    """
+    # Elements of the left run that are no greater than the right run's head are already in place,
+    # as are elements of the right run that are no smaller than the left run's tail
+    lo = _gallop_right(arr, arr[mid], lo, mid)
+    if lo == mid:
+        return
+    hi = _gallop_left(arr, arr[mid - 1], mid, hi)
+
+    tmp = slice_copy(arr, lo, mid)  # Copy of the left run
+    i, na = 0, mid - lo
+    j, dest = mid, lo
+    while True:
+        # One element at a time until one run keeps winning
+        wins_a = wins_b = 0
+        while wins_a < MIN_GALLOP and wins_b < MIN_GALLOP:
+            if arr[j] < tmp[i]:
+                arr[dest] = arr[j]
+                dest += 1
+                j += 1
+                if j == hi:
+                    break
+                wins_a, wins_b = 0, wins_b + 1
+            else:
+                arr[dest] = tmp[i]
+                dest += 1
+                i += 1
+                if i == na:
+                    break
+                wins_a, wins_b = wins_a + 1, 0
+        if i == na or j == hi:
+            break
+
+        # Galloping: move whole blocks from the winning run with one slice assignment each
+        k = _gallop_right(tmp, arr[j], i, na)
+        arr[dest:dest + k - i] = tmp[i:k]
+        dest += k - i
+        i = k
+        if i == na:
+            break
+        k = _gallop_left(arr, tmp[i], j, hi)
+        arr[dest:dest + k - j] = arr[j:k]
+        dest += k - j
+        j = k
+        if j == hi:
+            break
+
+    arr[dest:dest + na - i] = tmp[i:]  # Copy the rest of the left run; the rest of the right run is already in place
+
+def _merge_at(arr, runs, i):
+    """
+    Merges runs[i] with runs[i + 1] and replaces them on the run stack.
+    """
+    start, length = runs[i]
+    length2 = runs[i + 1][1]
+    _merge(arr, start, start + length, start + length + length2)
+    runs[i] = (start, length + length2)
+    del runs[i + 1]
+
+def _merge_collapse(arr, runs):
+    """
+    Merges runs on top of the stack until every run is longer than the two above it
+    combined, which keeps the merges balanced and the stack O(log n) deep.
+    """
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+            if runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+        elif runs[n][1] > runs[n + 1][1]:
+            break
+        _merge_at(arr, runs, n)
+
+def hybrid_sort(arr):
+    """
+    Natural merge sort in the spirit of Timsort.
+
+    Splits the array into its existing ascending and strictly descending runs,
+    reversing the descending ones, extends runs shorter than the minimum run with
+    the binary insertion kernel, and merges them with a galloping merge. Sorted or
+    reversed input is a single run and costs O(n); random input costs O(n log n).
+    The sort is stable.
+
+    :param arr: The array to be sorted; any writable buffer is sorted in place.
+    """
+    arr = as_buffer(arr)
+    n = len(arr)
+    if n < 2:
+        return
+    min_run = _min_run(n)
+    runs = []  # Stack of (start, length) runs still to be merged
+    lo = 0
+    while lo < n:
+        end = _count_run(arr, lo, n)
+        if end - lo < min_run:
+            end = min(lo + min_run, n)
+            binary_insertion_sort(arr, lo, end - 1)  # Extend the short run
+        runs.append((lo, end - lo))
+        _merge_collapse(arr, runs)
+        lo = end
+
+    while len(runs) > 1:
+        n = len(runs) - 2
+        if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+            n -= 1
+        _merge_at(arr, runs, n)
+
+def run_tests(values_start, values_stop, steps, presortedness_values, rep, workers=1, seed=None, store=None, plot=True, output=None):
+    """
+    Runs tests on the hybrid sort algorithm with varying array sizes and presortedness levels.
+
+    :param values_start: The starting size of the arrays.
+    :param values_stop: The maximum size of the arrays.
+    :param steps: The number of intervals to divide the size range.
+    :param presortedness_values: A list of presortedness levels to test.
+    :param rep: The number of repetitions for each test.
+    :param workers: The number of worker processes to spread the tests over.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param store: A ResultStore that keeps finished cells on disk and skips cells already run.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary containing the average time taken for each presortedness level.
+    """
+    from gridRunner import run_grid  # Harness imports stay out of the kernels' import path
+    from workload import generate_array
+    from timing import measure_time
+    from report import plot_results
+
+    step_size = (values_stop - values_start) // steps  # Calculate step size
+    sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
+
+    results = run_grid(hybrid_sort, generate_array, measure_time, sizes, presortedness_values, rep, workers, seed=seed, store=store)  # Time every cell
+
+    if plot:
+        plot_results(sizes, results, 'Hybrid Sort Performance', output=output)
+    return results
+
+if __name__ == "__main__":
+    values_start = 1000  # Minimum number of entries to sort
+    values_stop = 200000  # Maximum number of entries to sort
+    steps = 20  # Number of intervals
+    presortedness_values = [0, 0.5, 1]  # Presortedness levels to test
+    rep = 5  # Number of repetitions for each test
+    workers = 1  # Number of worker processes
+
+    run_tests(values_start, values_stop, steps, presortedness_values, rep, workers)  # Run tests
@@ -1,35 +1,74 @@
-import random
-import time
-import numpy as np
-import matplotlib.pyplot as plt
-
-def generate_array(size, presortedness):
-    arr = list(range(size))
-    if presortedness == 1:
-        return arr
-    elif presortedness == 0:
-        return arr[::-1]
-    else:
-        random.shuffle(arr)
-        return arr
+from bisect import bisect_right
+from buffers import as_buffer
 
 def insertion_sort(arr):
-    for i in range(1, len(arr)):
-        key = arr[i]
+    buf = as_buffer(arr)
+    for i in range(1, len(buf)):
+        key = buf[i]
         j = i - 1
-        while j >= 0 and arr[j] > key:
-            arr[j + 1] = arr[j]
+        while j >= 0 and buf[j] > key:
+            buf[j + 1] = buf[j]
             j -= 1
-        arr[j + 1] = key
+        buf[j + 1] = key
     return arr
 
-def measure_time(sort_function, arr):
-    start_time = time.perf_counter()
-    sort_function(arr.copy())  # use a copy to avoid sorting in place
-    end_time = time.perf_counter()
-    return end_time - start_time
+def binary_insertion_sort(arr, low=0, high=None):
+    """
+    Insertion sort that finds each insertion point by binary search and shifts the
+    sorted prefix with one slice assignment, which runs as a C-level memmove.
+
+    This is the small-run kernel the other algorithms call on short segments.
+    Equal elements keep their order, so the sort is stable.
+
+    :param arr: The array to be sorted.
+    :param low: The starting index of the array segment to be sorted.
+    :param high: The ending index of the array segment to be sorted (defaults to the last index).
+    """
+    arr = as_buffer(arr)
+    if high is None:
+        high = len(arr) - 1
+    for i in range(low + 1, high + 1):
+        key = arr[i]
+        if not key < arr[i - 1]:
+            continue  # Already in place, the common case on presorted input
+        pos = bisect_right(arr, key, low, i)
+        arr[pos + 1:i + 1] = arr[pos:i]  # Shift the block right in one move
+        arr[pos] = key
+
+SHELL_GAPS = (701, 301, 132, 57, 23, 10, 4, 1)  # Ciura's gap sequence
+
+def shell_sort(arr, low=0, high=None):
+    """
+    Shell sort: gapped insertion sort passes over Ciura's gap sequence.
+
+    Useful for mid-size arrays, where it moves far-out-of-place elements in long
+    hops before the final gap-1 pass, which is a plain insertion sort.
+
+    :param arr: The array to be sorted.
+    :param low: The starting index of the array segment to be sorted.
+    :param high: The ending index of the array segment to be sorted (defaults to the last index).
+    """
+    arr = as_buffer(arr)
+    if high is None:
+        high = len(arr) - 1
+    n = high - low + 1
+    gaps = list(SHELL_GAPS)
+    while gaps[0] * 2.25 < n:
+        gaps.insert(0, int(gaps[0] * 2.25))  # Extend the sequence for large arrays
+    for gap in gaps:
+        for i in range(low + gap, high + 1):
+            key = arr[i]
+            j = i - gap
+            while j >= low and key < arr[j]:
+                arr[j + gap] = arr[j]
+                j -= gap
+            arr[j + gap] = key
+
+def main(sort_function=insertion_sort, plot=True, output=None):
+    from workload import generate_array  # Harness imports stay out of the kernels' import path
+    from timing import measure_time
+    from report import plot_results
 
-def main():
     start = 0  # Start from 1000 to avoid size 0
     stop = 1000
     steps = 100
@@ -44,20 +83,14 @@ def main():
             total_time = 0
             for _ in range(rep):
                 arr = generate_array(size, presortedness)
-                total_time += measure_time(insertion_sort, arr)
+                total_time += measure_time(sort_function, arr)
             avg_time = total_time / rep
             results[presortedness].append(avg_time)
             print(f"Size: {size}, Presortedness: {presortedness}, Time: {avg_time:.5f}")
 
-    for presortedness, times in results.items():
-        plt.plot(sizes, times, label=f"Presortedness = {presortedness}")
-
-    plt.xlabel('Array Size')
-    plt.ylabel('Time (seconds)')
-    plt.title('Insertion Sort Performance')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if plot:
+        plot_results(sizes, results, 'Insertion Sort Performance', output=output)
+    return results
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,229 @@
+import ast
+import array
+import inspect
+import textwrap
+import types
+from reach import referenced_names, in_repo
+
+ALLOCATORS = {"copy_buffer", "slice_copy", "copy", "list", "sorted"}  # Calls that return a fresh buffer
+STACK_NAMES = {"stack", "runs"}  # Locals used as explicit recursion stacks
+NOT_INSTRUMENTED = {"buffers", "timing", "gridRunner", "workload", "instrument"}  # Harness modules
+OPERATIONS = ("comparisons", "swaps", "moves", "allocations", "allocated", "max_depth", "max_stack")  # Keys of count_operations()
+
+class OpCounter:
+    """
+    The operation counts shared by one family of instrumented functions.
+    """
+    __slots__ = ("comparisons", "swaps", "moves", "allocations", "allocated", "depth", "max_depth", "max_stack")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.comparisons = self.swaps = self.moves = 0
+        self.allocations = self.allocated = 0
+        self.depth = self.max_depth = self.max_stack = 0
+
+    def alloc(self, value):
+        """
+        Records value as an auxiliary allocation if it is a new buffer, and returns it.
+        """
+        if isinstance(value, (list, bytearray, array.array)) or hasattr(value, "__array_interface__"):
+            self.allocations += 1
+            self.allocated += len(value)
+        return value
+
+    def stack(self, length):
+        if length > self.max_stack:
+            self.max_stack = length
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in OPERATIONS}
+
+def _ops(attr):
+    return ast.Attribute(value=ast.Name(id="__ops__", ctx=ast.Load()), attr=attr, ctx=ast.Load())
+
+def _count(attr, amount):
+    return ast.AugAssign(target=ast.Attribute(value=ast.Name(id="__ops__", ctx=ast.Load()), attr=attr, ctx=ast.Store()),
+                         op=ast.Add(), value=amount)
+
+def _call(attr, *args):
+    return ast.Call(func=_ops(attr), args=list(args), keywords=[])
+
+class _Instrumenter(ast.NodeTransformer):
+    """
+    Rewrites a kernel's source so every element write, swap, auxiliary allocation,
+    call level and explicit stack push is recorded on __ops__.
+    """
+
+    def __init__(self):
+        self.temps = 0
+
+    def visit_FunctionDef(self, node):
+        self.generic_visit(node)
+        enter = [_count("depth", ast.Constant(1)),
+                 ast.If(test=ast.Compare(left=_ops("depth"), ops=[ast.Gt()], comparators=[_ops("max_depth")]),
+                        body=[ast.Assign(targets=[ast.Attribute(value=ast.Name(id="__ops__", ctx=ast.Load()),
+                                                                attr="max_depth", ctx=ast.Store())],
+                                         value=_ops("depth"))],
+                        orelse=[])]
+        leave = [ast.AugAssign(target=ast.Attribute(value=ast.Name(id="__ops__", ctx=ast.Load()), attr="depth", ctx=ast.Store()),
+                               op=ast.Sub(), value=ast.Constant(1))]
+        node.body = enter + [ast.Try(body=node.body, handlers=[], orelse=[], finalbody=leave)]
+        return node
+
+    def visit_Assign(self, node):
+        self.generic_visit(node)
+        if len(node.targets) != 1:
+            return node
+        target = node.targets[0]
+        if isinstance(target, ast.Subscript) and isinstance(target.slice, ast.Slice):
+            # Block move: count every element written
+            self.temps += 1
+            temp = f"__block{self.temps}__"
+            return [ast.Assign(targets=[ast.Name(id=temp, ctx=ast.Store())], value=node.value),
+                    ast.Assign(targets=[target], value=ast.Name(id=temp, ctx=ast.Load())),
+                    _count("moves", ast.Call(func=ast.Name(id="len", ctx=ast.Load()),
+                                             args=[ast.Name(id=temp, ctx=ast.Load())], keywords=[]))]
+        if isinstance(target, ast.Subscript):
+            return [node, _count("moves", ast.Constant(1))]
+        if isinstance(target, ast.Tuple) and target.elts and all(isinstance(e, ast.Subscript) for e in target.elts):
+            return [node, _count("swaps", ast.Constant(1))]
+        return node
+
+    def visit_Subscript(self, node):
+        self.generic_visit(node)
+        if isinstance(node.ctx, ast.Load) and isinstance(node.slice, ast.Slice):
+            return _call("alloc", node)  # Slicing a list copies it
+        return node
+
+    def visit_ListComp(self, node):
+        self.generic_visit(node)
+        return _call("alloc", node)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Add):
+            return _call("alloc", node)  # List concatenation builds a new list
+        return node
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id in ALLOCATORS:
+            return _call("alloc", node)
+        return node
+
+    def visit_Expr(self, node):
+        self.generic_visit(node)
+        call = node.value
+        if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "append" \
+                and isinstance(call.func.value, ast.Name) and call.func.value.id in STACK_NAMES:
+            name = call.func.value.id
+            return [node, ast.Expr(_call("stack", ast.Call(func=ast.Name(id="len", ctx=ast.Load()),
+                                                           args=[ast.Name(id=name, ctx=ast.Load())], keywords=[])))]
+        return node
+
+def _is_kernel(value):
+    if not isinstance(value, types.FunctionType):
+        return False
+    module = value.__module__.rsplit(".", 1)[-1]
+    if module in NOT_INSTRUMENTED:
+        return False
+    return in_repo(value)  # Instrumented variants have a made-up file name and are skipped
+
+def _instrument(func, counter, done):
+    if func in done:
+        return done[func]
+    tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+    tree = ast.fix_missing_locations(_Instrumenter().visit(tree))
+    namespace = dict(func.__globals__)
+    namespace["__ops__"] = counter
+    exec(compile(tree, f"<instrumented {func.__module__}.{func.__name__}>", "exec"), namespace)
+    variant = namespace[func.__name__]
+    done[func] = variant
+    # Point every kernel it calls at the instrumented variants; its own name already is
+    for name in referenced_names(variant.__code__):
+        value = namespace.get(name)
+        if _is_kernel(value):
+            namespace[name] = _instrument(value, counter, done)
+    return variant
+
+_variants = {}  # Original function -> (instrumented variant, its counter)
+
+def instrumented(func):
+    """
+    Returns an instrumented copy of a sort kernel and the counter it reports to.
+
+    The copy is compiled from the kernel's source with counting statements added,
+    and so are all the repo kernels it calls, so the original functions are left
+    exactly as they are and cost nothing extra when counting is off.
+
+    :param func: The sort function.
+    :return: A tuple (variant, counter).
+    """
+    if func not in _variants:
+        counter = OpCounter()
+        _variants[func] = (_instrument(func, counter, {}), counter)
+    return _variants[func]
+
+def count_operations(func, arr, *args):
+    """
+    Runs an instrumented copy of func on a copy of arr and returns its operation counts.
+
+    Elements are wrapped so that every element comparison is counted, including
+    those made inside C helpers such as bisect. Writes of single elements and of
+    slices are counted as moves, tuple assignments of two elements as swaps, and
+    slices, copies, list comprehensions and concatenations as auxiliary allocations
+    (allocated is their total length). max_depth is the deepest nesting of kernel
+    calls and max_stack the largest explicit stack.
+
+    :param func: The sort function.
+    :param arr: The input array, which is left untouched.
+    :param args: Further arguments for func.
+    :return: A dictionary of operation counts.
+    """
+    variant, counter = instrumented(func)
+
+    class Element:
+        __slots__ = ("value",)
+
+        def __init__(self, value):
+            self.value = value
+
+        def __lt__(self, other):
+            counter.comparisons += 1
+            return self.value < other.value
+
+        def __le__(self, other):
+            counter.comparisons += 1
+            return self.value <= other.value
+
+        def __gt__(self, other):
+            counter.comparisons += 1
+            return self.value > other.value
+
+        def __ge__(self, other):
+            counter.comparisons += 1
+            return self.value >= other.value
+
+        def __eq__(self, other):
+            counter.comparisons += 1
+            return self.value == other.value
+
+        __hash__ = None
+
+    items = [Element(value) for value in arr]
+    counter.reset()
+    variant(items, *args)
+    return counter.as_dict()
+
+def print_operations(operations):
+    """
+    Prints the operation counts of every (size, presortedness) cell collected by run_grid(operations=...).
+    """
+    for (size, presortedness), cell in operations.items():
+        if cell is None or cell["comparisons"] is None:
+            print(f"  Size: {size}, Presortedness: {presortedness}, not instrumentable")
+            continue
+        print(f"  Size: {size}, Presortedness: {presortedness}, Comparisons: {cell['comparisons']:.0f}, "
+              f"Swaps: {cell['swaps']:.0f}, Moves: {cell['moves']:.0f}, Allocations: {cell['allocations']:.0f}")
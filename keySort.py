@@ -0,0 +1,252 @@
+import array
+import random
+
+def _scatter_positions(keys, sort_func, low, high, reverse):
+    """
+    Sorts integer keys on their own with sort_func and deals out their positions in order.
+
+    Equal integer keys cannot be told apart, so the positions of each key are scattered
+    into its run of the sorted keys in their original order, which keeps the permutation
+    stable. This suits sorts whose cost grows with the key range, such as counting_sort,
+    for which packing the position into the key would multiply the range by n.
+    """
+    if -2 ** 63 <= low and high < 2 ** 63:
+        ordered = array.array("q", keys)
+    else:
+        ordered = list(keys)
+    result = sort_func(ordered)
+    if result is not None and result is not ordered:
+        ordered = result
+    if reverse:
+        ordered = ordered[::-1]
+    slots = {}
+    for slot, k in enumerate(ordered):
+        slots.setdefault(k, slot)  # First slot of every key's run
+    index = [0] * len(keys)
+    for i, k in enumerate(keys):
+        index[slots[k]] = i
+        slots[k] += 1
+    return index
+
+def _permutation(keys, sort_func, reverse):
+    """
+    Sorts the positions 0..n-1 of keys by key and returns them.
+
+    Integer keys whose range allows it are packed with their position into one int64,
+    (key - min) * n + position, in a compact array.array that every kernel (and the radix
+    sorts) can sort directly. Integer keys too wide to pack, or that sort_func rejects
+    packed because of their range, are sorted on their own (see _scatter_positions).
+    Other keys are paired with their position in tuples, which compare in C. Either way
+    equal keys keep their order whatever sort_func is, and no Python-level comparison
+    method is ever called.
+    """
+    n = len(keys)
+    if all(type(k) is int for k in keys):
+        low, high = min(keys), max(keys)
+        if (high - low + 1) * n >= 2 ** 63:
+            return _scatter_positions(keys, sort_func, low, high, reverse)
+        if reverse:
+            packed = array.array("q", [(high - k) * n + i for i, k in enumerate(keys)])
+        else:
+            packed = array.array("q", [(k - low) * n + i for i, k in enumerate(keys)])
+        try:
+            result = sort_func(packed)
+        except ValueError:
+            return _scatter_positions(keys, sort_func, low, high, reverse)  # Packed range too wide, e.g. counting_sort
+        if result is not None and result is not packed:
+            packed = result  # Out-of-place sorts return the sorted copy
+        return [p % n for p in packed]
+
+    if reverse:
+        decorated = [(k, -i) for i, k in enumerate(keys)]  # Sorted ascending, then read backwards
+    else:
+        decorated = [(k, i) for i, k in enumerate(keys)]
+    result = sort_func(decorated)
+    if result is not None and result is not decorated:
+        decorated = result
+    if reverse:
+        return [-i for _, i in reversed(decorated)]
+    return [i for _, i in decorated]
+
+def sort_by_key(arr, sort_func, key=None, reverse=False):
+    """
+    Sorts arr in place with any sort function, by a key and/or in reverse, stably.
+
+    Decorate-sort-undecorate: key is called exactly once per element, the keys and
+    positions are sorted by sort_func, and the resulting permutation is applied to arr
+    in one pass. The sort is stable even when sort_func is not, because the positions
+    break ties.
+
+    :param arr: The list or buffer to be sorted.
+    :param sort_func: Any registered sort, in place or out of place.
+    :param key: A function of one element returning its sort key (defaults to the element).
+    :param reverse: Whether to sort in descending order (equal keys still keep their order).
+    :return: arr.
+    :raises TypeError: If sort_func cannot sort the keys, e.g. the radix sorts with non-integer keys.
+    :raises ValueError: If sort_func cannot sort keys of that range, e.g. counting_sort with keys far wider than n.
+    """
+    n = len(arr)
+    if n < 2:
+        return arr
+    values = list(arr)
+    keys = values if key is None else [key(value) for value in values]
+    index = _permutation(keys, sort_func, reverse)
+    ordered = [values[i] for i in index]
+    if isinstance(arr, array.array):
+        arr[:] = array.array(arr.typecode, ordered)
+    elif isinstance(arr, memoryview):
+        arr[:] = array.array(arr.format, ordered)  # A memoryview only takes a buffer of its own format
+    else:
+        arr[:] = ordered
+    return arr
+
+def is_stable(sort_func, size=500, distinct=10, trials=5, seed=0):
+    """
+    Checks empirically whether a sort keeps equal elements in their original order.
+
+    Records with few distinct keys are sorted directly, comparing keys only, and their
+    original positions are checked to be increasing within every key.
+
+    :param sort_func: The sort function to check.
+    :param size: The number of records per trial.
+    :param distinct: The number of distinct keys.
+    :param trials: The number of random trials.
+    :param seed: The seed of the trials.
+    :return: True if no trial reordered equal keys, False if one did, or None if
+             sort_func cannot sort records (e.g. the integer-only radix sorts).
+    """
+    rng = random.Random(seed)
+
+    class Record:
+        __slots__ = ("key", "position")
+
+        def __init__(self, key, position):
+            self.key = key
+            self.position = position
+
+        def __lt__(self, other):
+            return self.key < other.key
+
+        def __gt__(self, other):
+            return self.key > other.key
+
+        def __le__(self, other):
+            return self.key <= other.key
+
+        def __ge__(self, other):
+            return self.key >= other.key
+
+        def __eq__(self, other):
+            return self.key == other.key
+
+        __hash__ = None
+
+    for _ in range(trials):
+        records = [Record(rng.randrange(distinct), i) for i in range(size)]
+        try:
+            result = sort_func(records)
+        except TypeError:
+            return None
+        if result is not None:
+            records = result
+        for a, b in zip(records, records[1:]):
+            if a.key == b.key and a.position > b.position:
+                return False
+    return True
+
+def check_registry(algorithms=None):
+    """
+    Compares the declared stability of registered algorithms with is_stable().
+
+    :param algorithms: The Algorithms to check (defaults to the whole registry).
+    :return: A dictionary of name -> (declared, measured).
+    """
+    import registry
+    results = {}
+    for algorithm in algorithms or registry.select():
+        measured = is_stable(algorithm.func)
+        results[algorithm.name] = (algorithm.stable, measured)
+        flag = "" if measured is None or measured == algorithm.stable else "  <-- mismatch"
+        print(f"{algorithm.name:<26} declared {'stable' if algorithm.stable else 'unstable':<9} "
+              f"measured {'-' if measured is None else 'stable' if measured else 'unstable'}{flag}")
+    return results
+
+def _per_comparison(sort_func, key, reverse):
+    """
+    The naive alternative to sort_by_key: wrappers that call key on every comparison.
+    """
+    class Keyed:
+        __slots__ = ("value",)
+
+        def __init__(self, value):
+            self.value = value
+
+        def __lt__(self, other):
+            if reverse:
+                return key(other.value) < key(self.value)
+            return key(self.value) < key(other.value)
+
+        def __gt__(self, other):
+            return other.__lt__(self)
+
+        def __le__(self, other):
+            return not other.__lt__(self)
+
+        def __ge__(self, other):
+            return not self.__lt__(other)
+
+    def sort(arr):
+        wrapped = [Keyed(value) for value in arr]
+        result = sort_func(wrapped)
+        arr[:] = [w.value for w in (wrapped if result is None else result)]
+    return sort
+
+def run_tests(values_start, values_stop, steps, rep, algorithm="merge_sort_bottom_up", seed=None, plot=True, output=None):
+    """
+    Compares cached keys (sort_by_key) with calling the key on every comparison.
+
+    The records are (name, score) tuples sorted by score.
+
+    :param values_start: The starting number of records.
+    :param values_stop: The maximum number of records.
+    :param steps: The number of intervals to divide the size range.
+    :param rep: The number of repetitions for each test.
+    :param algorithm: The registered algorithm to sort with.
+    :param seed: A seed that makes the generated records reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary containing the average time taken by each method for each size.
+    """
+    import registry
+    from operator import itemgetter
+    from timing import measure_time
+    from report import plot_results
+
+    sort_func = registry.get(algorithm).func
+    key = itemgetter(1)
+    methods = {"cached keys": lambda arr: sort_by_key(arr, sort_func, key),
+               "key per comparison": _per_comparison(sort_func, key, False)}
+    step_size = max(1, (values_stop - values_start) // steps)  # Calculate step size
+    sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
+    results = {name: [] for name in methods}
+    rng = random.Random(seed)
+    for size in sizes:
+        records = [(f"item{i}", rng.randrange(size or 1)) for i in range(size)]
+        for name, method in methods.items():
+            avg_time = sum(measure_time(method, records) for _ in range(rep)) / rep
+            results[name].append(avg_time)
+            print(f'Size: {size}, {name}, Avg Time: {avg_time:.5f}')
+
+    if plot:
+        plot_results(sizes, results, f'Key Caching ({algorithm})', label="{}", output=output)
+    return results
+
+if __name__ == "__main__":
+    check_registry()  # Declared against measured stability
+
+    values_start = 1000  # Minimum number of records to sort
+    values_stop = 50000  # Maximum number of records to sort
+    steps = 10  # Number of intervals
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(values_start, values_stop, steps, rep)  # Run tests
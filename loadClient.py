@@ -0,0 +1,156 @@
+import time
+import asyncio
+import argparse
+import numpy as np
+from sortService import LatencyHistogram, encode_request, read_response, STATS_REQUEST
+
+async def connect(unix=None, host="127.0.0.1", port=8765):
+    """
+    Opens a connection to a sort service.
+
+    :return: A (reader, writer) pair.
+    """
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+async def sort_remote(reader, writer, name, arr):
+    """
+    Sorts arr on the service and returns the sorted numpy array.
+    """
+    writer.write(encode_request(name, arr))
+    await writer.drain()
+    return await read_response(reader)
+
+async def service_stats(unix=None, host="127.0.0.1", port=8765):
+    """
+    :return: The service's latency statistics.
+    """
+    reader, writer = await connect(unix, host, port)
+    try:
+        return await sort_remote(reader, writer, STATS_REQUEST, [])
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def run_load(unix=None, host="127.0.0.1", port=8765, concurrency=16, requests=1000, sizes=(8, 64, 10000),
+                   weights=None, algorithm="quick_sort", seed=None, check=True):
+    """
+    Sends requests from concurrency connections at once, each waiting for its previous
+    answer, and measures the throughput and client-side latency.
+
+    :param concurrency: The number of connections sending at the same time.
+    :param requests: The total number of requests.
+    :param sizes: The array sizes to draw each request from.
+    :param weights: The probability of each size (defaults to uniform).
+    :param algorithm: The registered algorithm to ask for.
+    :param seed: A seed that makes the requests reproducible.
+    :param check: Whether to verify every answer is the sorted request.
+    :return: A dictionary with the requests, items, errors, seconds, requests and items per
+             second, and the latency summary (p50, p90, p99, max) in seconds.
+    """
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(sizes), requests, p=weights)
+    inputs = [rng.integers(-2 ** 40, 2 ** 40, sizes[i]) for i in chosen]  # Generated before the clock starts
+    histogram = LatencyHistogram()
+    errors = []
+    next_request = iter(range(requests))
+
+    async def worker():
+        reader, writer = await connect(unix, host, port)
+        try:
+            for i in next_request:
+                began = time.perf_counter()
+                try:
+                    result = await sort_remote(reader, writer, algorithm, inputs[i])
+                except RuntimeError as e:
+                    errors.append(str(e))
+                    continue
+                histogram.record(time.perf_counter() - began)
+                if check and not np.array_equal(result, np.sort(inputs[i])):
+                    errors.append(f"request {i} came back unsorted")
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - began
+    items = sum(len(arr) for arr in inputs)
+    return {"requests": requests, "items": items, "errors": errors, "seconds": seconds,
+            "requests_per_second": requests / seconds, "items_per_second": items / seconds,
+            "latency": histogram.summary()}
+
+def _print_load(concurrency, load):
+    latency = load["latency"]
+    print(f"Concurrency: {concurrency}, {load['requests_per_second']:.0f} req/s, "
+          f"{load['items_per_second']:.0f} items/s, p50 {latency['p50'] * 1e3:.3f} ms, "
+          f"p99 {latency['p99'] * 1e3:.3f} ms, errors {len(load['errors'])}")
+
+async def run_tests(concurrency_levels, requests, sizes, algorithm="quick_sort", unix=None, host="127.0.0.1",
+                    port=8765, spawn=False, workers=1, seed=None, plot=True, output=None):
+    """
+    Measures the service's throughput and tail latency at increasing concurrency.
+
+    :param concurrency_levels: The numbers of concurrent connections to test.
+    :param requests: The number of requests per level.
+    :param sizes: The array sizes to draw requests from.
+    :param algorithm: The registered algorithm to ask for.
+    :param spawn: Whether to start a service in this process instead of using a running one.
+    :param workers: The pool size of a spawned service.
+    :param seed: A seed that makes the requests reproducible.
+    :param plot: Whether to plot the latencies.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary of the throughput and latency percentiles for each level.
+    """
+    service = server = None
+    if spawn:
+        from sortService import SortService, serve
+        service = SortService(workers)
+        server = await serve(service, unix, host, 0 if not unix else port)
+        if not unix:
+            port = server.sockets[0].getsockname()[1]
+    results = {"requests/s": [], "p50 (s)": [], "p99 (s)": []}
+    try:
+        for concurrency in concurrency_levels:
+            load = await run_load(unix, host, port, concurrency, requests, sizes, algorithm=algorithm, seed=seed)
+            _print_load(concurrency, load)
+            results["requests/s"].append(load["requests_per_second"])
+            results["p50 (s)"].append(load["latency"]["p50"])
+            results["p99 (s)"].append(load["latency"]["p99"])
+        stats = await service_stats(unix, host, port)
+        print(f"Service: {stats['batches']} batches, p50 {stats['all']['p50'] * 1e3:.3f} ms, "
+              f"p99 {stats['all']['p99'] * 1e3:.3f} ms")
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+            await service.close()
+
+    if plot:
+        from report import plot_results
+        plot_results(concurrency_levels, {name: results[name] for name in ("p50 (s)", "p99 (s)")},
+                     f'Sort Service Latency ({algorithm})', xlabel='Concurrent Connections', ylabel='Latency (seconds)',
+                     label="{}", output=output, index_name="concurrency")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a sort service.")
+    parser.add_argument("--unix", metavar="PATH", help="Connect to this Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--spawn", action="store_true", help="Start a service in this process first")
+    parser.add_argument("--workers", type=int, default=1, help="Pool size of a spawned service")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrent connections")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 64, 10000], help="Request sizes to draw from")
+    parser.add_argument("--algorithm", default="quick_sort", help="Registered algorithm to ask for")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the requests")
+    parser.add_argument("--output", nargs="+", help="Report files: .png/.svg/.pdf for the plot, .csv for the table")
+    parser.add_argument("--no-plot", action="store_true", help="Only print the results")
+    args = parser.parse_args(argv)
+    return asyncio.run(run_tests(args.concurrency, args.requests, args.sizes, args.algorithm, args.unix, args.host,
+                                 args.port, args.spawn, args.workers, args.seed, not args.no_plot, args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import os
+import sys
+import tracemalloc
+from buffers import copy_buffer
+
+SNAPSHOT_GROWTH = 1.1  # A hot-spot snapshot is retaken when traced memory grows this much past the last one
+
+def input_bytes(arr):
+    """
+    Returns the size of an input array's own storage: the pointer array of a list, the
+    buffer of an array.array, memoryview or numpy array. The elements a list points to
+    are not counted, since sorting moves pointers and never copies them.
+    """
+    nbytes = getattr(arr, "nbytes", None)  # numpy arrays and memoryviews
+    if nbytes is not None:
+        return nbytes
+    return sys.getsizeof(arr)
+
+def _traced(func, arr):
+    """
+    Runs func on arr with tracemalloc on.
+
+    :return: The peak and the retained bytes above what was traced when func was called.
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        result = func(arr)
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+        return peak - base, current - base
+    finally:
+        if started:
+            tracemalloc.stop()
+
+def hot_spots(func, arr, top=10, frames=1):
+    """
+    Finds where a sort allocates the memory it holds at its peak.
+
+    tracemalloc cannot snapshot the peak itself, so a profile hook snapshots the traced
+    memory whenever it has grown SNAPSHOT_GROWTH times past the previous snapshot, and
+    the last snapshot is compared with one taken before the call. The hook slows the
+    sort down, so peaks are measured in a separate run (see measure_memory).
+
+    :param func: The sort function.
+    :param arr: The input array, which is left untouched.
+    :param top: The number of allocation sites to return.
+    :param frames: The number of stack frames kept per allocation; more tells callers apart.
+    :return: A list of dictionaries with the "location" (file:line), the "size" in bytes
+             and the "count" of blocks allocated there, largest first.
+    """
+    arr = copy_buffer(arr)
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    state = {"size": 0, "snapshot": None}
+
+    def hook(frame, event, arg):
+        current = tracemalloc.get_traced_memory()[0]
+        if current > state["size"] * SNAPSHOT_GROWTH:
+            state["snapshot"] = tracemalloc.take_snapshot()
+            state["size"] = tracemalloc.get_traced_memory()[0]
+
+    try:
+        baseline = tracemalloc.take_snapshot()
+        state["size"] = tracemalloc.get_traced_memory()[0]
+        sys.setprofile(hook)
+        try:
+            result = func(arr)
+        finally:
+            sys.setprofile(None)
+        peak = state["snapshot"] or tracemalloc.take_snapshot()
+        del result
+    finally:
+        if started:
+            tracemalloc.stop()
+    stats = peak.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), "traceback" if frames > 1 else "lineno")
+    spots = []
+    for stat in stats:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[-1] if frames > 1 else stat.traceback[0]
+        spots.append({"location": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                      "size": stat.size_diff, "count": stat.count_diff})
+        if len(spots) == top:
+            break
+    return spots
+
+def measure_memory(func, arr, counts=None):
+    """
+    Measures the memory one call of func takes on a copy of arr.
+
+    The peak is the most memory tracemalloc saw allocated during the call beyond what
+    was allocated when it started; it includes the sorted copy returned by out-of-place
+    sorts. Only func itself runs: the allocation counts are copied from counts, the
+    instrumented run of the same input, when the caller made one.
+
+    :param func: The sort function.
+    :param arr: The input array, which is left untouched.
+    :param counts: The instrument.count_operations() result for arr, or None.
+    :return: A dictionary with the "peak" and "retained" bytes, the "input" bytes,
+             "aux_ratio" (peak / input), "allocations" (auxiliary buffers created) and
+             "allocated" (their total length); the last two are None without counts.
+    """
+    size = input_bytes(arr)
+    peak, retained = _traced(func, copy_buffer(arr))
+    allocations = allocated = None
+    if counts is not None:
+        allocations, allocated = counts["allocations"], counts["allocated"]
+    return {"peak": peak, "retained": retained, "input": size, "aux_ratio": peak / size if size else 0.0,
+            "allocations": allocations, "allocated": allocated}
+
+def print_memory(memory):
+    """
+    Prints the memory of every (size, presortedness) cell collected by run_grid(memory=...).
+    """
+    for (size, presortedness), cell in memory.items():
+        allocations = "-" if cell["allocations"] is None else f"{cell['allocations']:.0f}"
+        print(f"  Size: {size}, Presortedness: {presortedness}, Peak: {cell['peak'] / 1024:.1f} KiB, "
+              f"Aux/input: {cell['aux_ratio']:.2f}, Allocations: {allocations}")
+
+def print_hot_spots(spots):
+    for spot in spots:
+        print(f"  {spot['location']:<28} {spot['size'] / 1024:10.1f} KiB {spot['count']:8} blocks")
+
+def run_tests(values_start, values_stop, steps, seed=None, plot=True, output=None):
+    """
+    Compares the peak memory of the in-place sorts with the out-of-place ones, including
+    the list-comprehension quick_sort in allInOne.py.
+
+    :param values_start: The starting size of the arrays.
+    :param values_stop: The maximum size of the arrays.
+    :param steps: The number of intervals to divide the size range.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary containing the peak memory in bytes of each sort for each size.
+    """
+    from workload import generate_array
+    from mergSort import merge_sort, merge_sort_bottom_up
+    from quickSort import quick_sort
+    from heapSort import heap_sort
+    from allInOne import quick_sort as out_of_place_quick_sort
+    from report import plot_results
+
+    step_size = max(1, (values_stop - values_start) // steps)  # Calculate step size
+    sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
+    sorts = {"quick_sort": quick_sort, "heap_sort": heap_sort, "merge_sort": merge_sort,
+             "merge_sort_bottom_up": merge_sort_bottom_up, "out-of-place quick_sort": out_of_place_quick_sort}
+    results = {name: [] for name in sorts}
+    for i, size in enumerate(sizes):
+        arr = generate_array(size, 0.5, seed=None if seed is None else [seed, i])
+        for name, sort_func in sorts.items():
+            memory = measure_memory(sort_func, arr)
+            results[name].append(memory["peak"])
+            print(f'Size: {size}, {name}, Peak: {memory["peak"] / 1024:.1f} KiB, Aux/input: {memory["aux_ratio"]:.2f}')
+
+    if plot:
+        plot_results(sizes, results, 'Sorting Algorithms Peak Memory', ylabel='Peak Memory (bytes)', label="{}",
+                     output=output)
+    return results
+
+if __name__ == "__main__":
+    values_start = 1000  # Minimum number of entries to sort
+    values_stop = 100000  # Maximum number of entries to sort
+    steps = 10  # Number of intervals
+
+    run_tests(values_start, values_stop, steps)  # Run tests
+
+    from workload import generate_array
+    from allInOne import quick_sort
+    print("Allocation hot spots of the out-of-place quick_sort:")
+    print_hot_spots(hot_spots(quick_sort, generate_array(100000, 0.5, seed=0)))
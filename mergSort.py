@@ -1,16 +1,15 @@
-import random
-import time
-import numpy as np
-import matplotlib.pyplot as plt
+from insertionSort import binary_insertion_sort
+from buffers import as_buffer, copy_buffer, slice_copy
 
 def merge_sort(arr):
     """
     Implementation of the merge sort algorithm.
     """
+    arr = as_buffer(arr)
     if len(arr) > 1:
         mid = len(arr) // 2  # Finding the mid of the array
-        L = arr[:mid]  # Dividing the elements into 2 halves
-        R = arr[mid:]
+        L = slice_copy(arr, 0, mid)  # Dividing the elements into 2 halves
+        R = slice_copy(arr, mid, len(arr))
 
         merge_sort(L)  # Sorting the first half
         merge_sort(R)  # Sorting the second half
@@ -19,12 +18,12 @@ def merge_sort(arr):
 
         # Copy data to temporary arrays L[] and R[]
         while i < len(L) and j < len(R):
-            if L[i] < R[j]:
-                arr[k] = L[i]
-                i += 1
-            else:
+            if R[j] < L[i]:
                 arr[k] = R[j]
                 j += 1
+            else:
+                arr[k] = L[i]  # Ties take the left half first, which keeps the sort stable
+                i += 1
             k += 1
 
         # Checking if any element was left
@@ -38,39 +37,65 @@ def merge_sort(arr):
             j += 1
             k += 1
 
-def generate_array(size, presortedness):
+def merge_sort_bottom_up(arr, run=32):
     """
-    Generates an array of the given size with a specified level of presortedness.
-    
-    :param size: The size of the array to generate.
-    :param presortedness: The degree to which the array is presorted (0 to 1).
-    :return: A list of integers.
-    """
-    arr = list(range(size))
-    if presortedness == 0:
-        arr.reverse()  # Reverse the array for minimum presortedness
-    elif presortedness == 1:
-        pass  # Already sorted array for maximum presortedness
-    else:
-        random.shuffle(arr)  # Shuffle the array for random disorder
-        presorted_elements = int(size * presortedness)
-        arr[:presorted_elements] = sorted(arr[:presorted_elements])  # Partially sort based on presortedness
-    return arr
-
-def measure_time(func, *args):
-    """
-    Measures the time taken to execute a given function with the provided arguments.
-    
-    :param func: The function to measure.
-    :param args: The arguments to pass to the function.
-    :return: The time taken in seconds.
+    Iterative bottom-up merge sort using a single auxiliary buffer.
+
+    Runs of `run` elements are insertion sorted in place, then merged in passes of
+    doubling width that alternate between the array and the buffer. Adjacent runs
+    that are already in order are copied instead of merged, so presorted input
+    costs close to linear time.
+
+    :param arr: The array to be sorted.
+    :param run: The length of the runs sorted by insertion sort before merging.
     """
-    start = time.time()  # Start time
-    func(*args)  # Execute function
-    end = time.time()  # End time
-    return end - start  # Time taken
+    arr = as_buffer(arr)
+    n = len(arr)
+
+    # Insertion sort every small run in place
+    for lo in range(0, n, run):
+        binary_insertion_sort(arr, lo, min(lo + run, n) - 1)
+
+    src, dst = arr, copy_buffer(arr)  # The one auxiliary buffer, swapped with arr after every pass
+    width = run
+    while width < n:
+        for lo in range(0, n, 2 * width):
+            mid = min(lo + width, n)
+            hi = min(lo + 2 * width, n)
+            if mid >= hi or src[mid - 1] <= src[mid]:
+                dst[lo:hi] = src[lo:hi]  # Runs already in order, no merge needed
+                continue
 
-def run_tests(values_start, values_stop, steps, presortedness_values, rep):
+            i, j, k = lo, mid, lo
+            left, right = src[i], src[j]
+            while True:
+                if left <= right:  # Take from the left run on ties to keep the sort stable
+                    dst[k] = left
+                    i += 1
+                    k += 1
+                    if i == mid:
+                        break
+                    left = src[i]
+                else:
+                    dst[k] = right
+                    j += 1
+                    k += 1
+                    if j == hi:
+                        break
+                    right = src[j]
+
+            # Copy whatever is left of the unfinished run
+            if i < mid:
+                dst[k:hi] = src[i:mid]
+            else:
+                dst[k:hi] = src[j:hi]
+        src, dst = dst, src
+        width *= 2
+
+    if src is not arr:
+        arr[:] = src  # The last pass wrote into the buffer
+
+def run_tests(values_start, values_stop, steps, presortedness_values, rep, workers=1, seed=None, sort_func=merge_sort, store=None, plot=True, output=None):
     """
     Runs tests on the merge sort algorithm with varying array sizes and presortedness levels.
     
@@ -79,34 +104,27 @@ def run_tests(values_start, values_stop, steps, presortedness_values, rep):
     :param steps: The number of intervals to divide the size range.
     :param presortedness_values: A list of presortedness levels to test.
     :param rep: The number of repetitions for each test.
+    :param workers: The number of worker processes to spread the tests over.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param sort_func: The merge sort variant to test.
+    :param store: A ResultStore that keeps finished cells on disk and skips cells already run.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
     :return: A dictionary containing the average time taken for each presortedness level.
     """
-    results = {level: [] for level in presortedness_values}  # Initialize results dictionary
+    from gridRunner import run_grid  # Harness imports stay out of the kernels' import path
+    from workload import generate_array
+    from timing import measure_time
+    from report import plot_results
+
     step_size = (values_stop - values_start) // steps  # Calculate step size
     sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
     
-    for size in sizes:
-        for presortedness in presortedness_values:
-            times = []
-            for _ in range(rep):
-                arr = generate_array(size, presortedness)  # Generate array
-                arr_copy = arr[:]  # Copy array to avoid in-place sorting issues
-                time_taken = measure_time(merge_sort, arr_copy)  # Measure time taken to sort
-                times.append(time_taken)  # Record time
-            avg_time = sum(times) / rep  # Calculate average time
-            results[presortedness].append(avg_time)  # Store average time
-            print(f'Size: {size}, Presortedness: {presortedness}, Avg Time: {avg_time:.5f}')  # Print results
+    results = run_grid(sort_func, generate_array, measure_time, sizes, presortedness_values, rep, workers, seed=seed, store=store)  # Time every cell
     
-    # Plot results
-    for presortedness, times in results.items():
-        plt.plot(sizes, times, label=f"Presortedness = {presortedness}")
-
-    plt.xlabel('Array Size')
-    plt.ylabel('Time (seconds)')
-    plt.title('Merge Sort Performance')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if plot:
+        plot_results(sizes, results, 'Merge Sort Performance', output=output)
+    return results
 
 if __name__ == "__main__":
     values_start = 1000  # Minimum number of entries to sort
@@ -114,5 +132,6 @@ if __name__ == "__main__":
     steps = 20  # Number of intervals
     presortedness_values = [0, 0.5, 1]  # Presortedness levels to test
     rep = 5  # Number of repetitions for each test
+    workers = 1  # Number of worker processes
     
-    run_tests(values_start, values_stop, steps, presortedness_values, rep)  # Run tests
+    run_tests(values_start, values_stop, steps, presortedness_values, rep, workers, sort_func=merge_sort_bottom_up)  # Run tests
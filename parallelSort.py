@@ -0,0 +1,199 @@
+import os
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from workload import generate_array
+
+_buffers = []  # The two shared buffers a pool worker sorts and merges between
+
+def _attach(names, length, dtype):
+    """
+    Pool initializer that maps both shared buffers into the worker.
+
+    :param names: The names of the two shared memory blocks.
+    :param length: The number of elements in each block.
+    :param dtype: The element type of the blocks.
+    """
+    for name in names:
+        shm = shared_memory.SharedMemory(name=name)  # The parent owns and unlinks the block
+        _buffers.append((shm, np.ndarray((length,), dtype=dtype, buffer=shm.buf)))
+
+def _sort_segment(task):
+    """
+    Sorts one segment of the first shared buffer in place.
+
+    :param task: A tuple (lo, hi) bounding the segment.
+    """
+    lo, hi = task
+    _buffers[0][1][lo:hi].sort()
+
+def _merge_part(task):
+    """
+    Merges one merge-path partition of two adjacent sorted runs into the other buffer.
+
+    :param task: A tuple (src, a_lo, a_hi, b_lo, b_hi, out_lo) where src picks the source buffer.
+    """
+    src, a_lo, a_hi, b_lo, b_hi, out_lo = task
+    source, dest = _buffers[src][1], _buffers[1 - src][1]
+    mid = out_lo + a_hi - a_lo
+    out_hi = mid + b_hi - b_lo
+    dest[out_lo:mid] = source[a_lo:a_hi]
+    dest[mid:out_hi] = source[b_lo:b_hi]
+    dest[out_lo:out_hi].sort(kind="stable")  # Timsort merges the two runs in one linear pass
+
+def merge_path_split(a, b, diagonal):
+    """
+    Finds how many elements of a come before output position diagonal in the stable merge of a and b.
+
+    :param a: The left sorted run.
+    :param b: The right sorted run.
+    :param diagonal: The output position to split at.
+    :return: The number of elements taken from a; diagonal minus it are taken from b.
+    """
+    lo, hi = max(0, diagonal - len(b)), min(diagonal, len(a))
+    while lo < hi:
+        i = (lo + hi) // 2
+        if a[i] <= b[diagonal - i - 1]:
+            lo = i + 1
+        else:
+            hi = i
+    return lo
+
+def _merge_tasks(arr, src, runs, parts):
+    """
+    Splits the pairwise merges of one round into about `parts` merge-path tasks.
+
+    :return: The tasks and the runs left after the round.
+    """
+    tasks, next_runs = [], []
+    total = runs[-1][1] - runs[0][0]
+    for k in range(0, len(runs) - 1, 2):
+        (a_lo, a_hi), (b_lo, b_hi) = runs[k], runs[k + 1]
+        a, b = arr[a_lo:a_hi], arr[b_lo:b_hi]
+        length = b_hi - a_lo
+        pieces = max(1, round(parts * length / total))  # Share the workers out by merge size
+        prev_i = prev_d = 0
+        for p in range(1, pieces + 1):
+            d = length * p // pieces
+            i = merge_path_split(a, b, d)
+            tasks.append((src, a_lo + prev_i, a_lo + i, b_lo + prev_d - prev_i, b_lo + d - i, a_lo + prev_d))
+            prev_i, prev_d = i, d
+        next_runs.append((a_lo, b_hi))
+    if len(runs) % 2:
+        lo, hi = runs[-1]
+        tasks.append((src, lo, hi, hi, hi, lo))  # The odd run out is copied across unchanged
+        next_runs.append(runs[-1])
+    return tasks, next_runs
+
+def parallel_merge_sort(arr, workers=None):
+    """
+    Sorts a numpy array, or any other writable buffer, in place on several cores.
+
+    The array is placed in shared memory and split into one segment per worker;
+    each worker sorts its segment in its own process. Adjacent runs are then merged
+    pairwise, round by round, into a second shared buffer and back. Each merge is
+    cut into merge-path partitions so all workers stay busy in the last rounds too.
+    Workers only receive index ranges, so no array data is pickled or sent between
+    processes; the only copies are into and out of shared memory.
+
+    :param arr: The array to be sorted; lists are sorted through a numpy copy.
+    :param workers: The number of worker processes (defaults to the number of usable cores).
+    """
+    if isinstance(arr, list):
+        values = np.array(arr)
+        parallel_merge_sort(values, workers)
+        arr[:] = values.tolist()
+        return
+    if not isinstance(arr, np.ndarray):
+        arr = np.asarray(memoryview(arr))  # A view of array.array, bytearray or memoryview memory
+    if workers is None:
+        workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    n = len(arr)
+    if n < 2 or workers <= 1:
+        arr.sort()
+        return
+
+    blocks = [shared_memory.SharedMemory(create=True, size=arr.nbytes) for _ in range(2)]
+    try:
+        views = [np.ndarray((n,), dtype=arr.dtype, buffer=shm.buf) for shm in blocks]
+        views[0][:] = arr  # The one copy in
+        bounds = [n * w // workers for w in range(workers + 1)]
+        runs = [(bounds[w], bounds[w + 1]) for w in range(workers) if bounds[w] < bounds[w + 1]]
+
+        with multiprocessing.Pool(workers, _attach, ([shm.name for shm in blocks], n, arr.dtype)) as pool:
+            pool.map(_sort_segment, runs)
+            src = 0
+            while len(runs) > 1:
+                tasks, runs = _merge_tasks(views[src], src, runs, workers)
+                pool.map(_merge_part, tasks)
+                src = 1 - src
+        arr[:] = views[src]  # The one copy out
+        del views
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+def run_tests(size, worker_counts, rep, seed=None, plot=True, output=None):
+    """
+    Runs tests on the parallel merge sort with a varying number of workers.
+
+    :param size: The size of the arrays.
+    :param worker_counts: A list of worker counts to test.
+    :param rep: The number of repetitions for each test.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plots and .csv the table; see report.plot_results.
+    :return: A dictionary containing the average time, speedup and efficiency for each worker count.
+    """
+    from report import split_outputs, write_csv, pyplot, finish
+
+    results = {"time": [], "speedup": [], "efficiency": []}
+    arr = generate_array(size, 0.5, seed=seed, as_array=True)
+
+    for workers in worker_counts:
+        times = []
+        for _ in range(rep):
+            arr_copy = arr.copy()  # Copy array to avoid in-place sorting issues
+            start = time.perf_counter()
+            parallel_merge_sort(arr_copy, workers)
+            times.append(time.perf_counter() - start)
+        avg_time = sum(times) / rep  # Calculate average time
+        speedup = results["time"][0] * worker_counts[0] / avg_time if results["time"] else worker_counts[0]
+        results["time"].append(avg_time)
+        results["speedup"].append(speedup)
+        results["efficiency"].append(speedup / workers)
+        print(f'Workers: {workers}, Avg Time: {avg_time:.5f}, Speedup: {speedup:.2f}, Efficiency: {speedup / workers:.2f}')
+
+    if not plot:
+        return results
+    tables, figures = split_outputs(output)
+    for path in tables:
+        write_csv(path, "workers", worker_counts, results)
+    if tables and not figures:
+        return results
+
+    # Plot results
+    plt = pyplot()
+    fig, (ax_speedup, ax_efficiency) = plt.subplots(1, 2, figsize=(12, 5))
+    ax_speedup.plot(worker_counts, results["speedup"], marker="o", label="Measured")
+    ax_speedup.plot(worker_counts, worker_counts, linestyle="--", label="Linear")
+    ax_speedup.set_xlabel('Workers')
+    ax_speedup.set_ylabel('Speedup')
+    ax_speedup.legend()
+    ax_speedup.grid(True)
+    ax_efficiency.plot(worker_counts, results["efficiency"], marker="o")
+    ax_efficiency.set_xlabel('Workers')
+    ax_efficiency.set_ylabel('Efficiency')
+    ax_efficiency.grid(True)
+    fig.suptitle(f'Parallel Merge Sort Scaling ({size} elements)')
+    finish(fig, figures, 'Parallel Merge Sort Scaling')
+    return results
+
+if __name__ == "__main__":
+    size = 10_000_000  # Number of entries to sort
+    worker_counts = list(range(1, (os.cpu_count() or 1) + 1))  # Worker counts to test
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(size, worker_counts, rep)  # Run tests
@@ -0,0 +1,163 @@
+from itertools import islice
+from quickSort import partition, quick_sort, INSERTION_CUTOFF
+from heapSort import heapify, heapify_min
+from insertionSort import binary_insertion_sort
+from buffers import as_buffer, copy_buffer
+
+def _heap_select(arr, low, high, k):
+    """
+    Moves the (k - low + 1) smallest items of arr[low..high] to the front with a bounded
+    max-heap and puts the largest of them at k. O(n log k) whatever the input.
+    """
+    m = k - low + 1
+    for i in range((m - 2) // 2, -1, -1):
+        heapify(arr, m, i, low=low)
+    for i in range(k + 1, high + 1):
+        if arr[i] < arr[low]:
+            arr[i], arr[low] = arr[low], arr[i]  # Evict the largest of the m smallest so far
+            heapify(arr, m, 0, low=low)
+    arr[low], arr[k] = arr[k], arr[low]
+
+def nth_element(arr, k, low=0, high=None):
+    """
+    Rearranges arr so arr[k] holds the item a full sort would put there, with no larger
+    item before it and no smaller one after it (an introselect).
+
+    Three-way partitions are narrowed down to the side holding k, which takes linear
+    time on average. Like quick_sort, the number of partitions is capped at 2*log2(n);
+    past that the rest is handled by a heap select, bounding the worst case at O(n log n).
+
+    :param arr: The array to rearrange.
+    :param k: The index of the order statistic (0 for the smallest).
+    :param low: The starting index of the array segment to select from.
+    :param high: The ending index of the array segment to select from (defaults to the last index).
+    :return: The k-th smallest item.
+    """
+    arr = as_buffer(arr)
+    if high is None:
+        high = len(arr) - 1
+    if not low <= k <= high:
+        raise IndexError(f"k={k} is outside [{low}, {high}]")
+    depth = 2 * max(high - low + 1, 1).bit_length()
+    while high - low + 1 > INSERTION_CUTOFF:
+        if depth == 0:
+            _heap_select(arr, low, high, k)  # Too many bad pivots
+            return arr[k]
+        depth -= 1
+        lt, gt = partition(arr, low, high)
+        if k < lt:
+            high = lt - 1
+        elif k > gt:
+            low = gt + 1
+        else:
+            return arr[k]  # k landed in the block equal to the pivot
+    binary_insertion_sort(arr, low, high)
+    return arr[k]
+
+def quickselect(arr, k):
+    """
+    Returns the k-th smallest item of arr (0 for the smallest), leaving arr untouched.
+
+    :param arr: The array to select from.
+    :param k: The rank of the item.
+    :return: The k-th smallest item.
+    """
+    return nth_element(copy_buffer(arr), k)
+
+def partial_sort(arr, k):
+    """
+    Sorts the k smallest items into arr[0..k-1] in place; the rest are left in no particular order.
+
+    nth_element puts the k smallest in front in O(n) on average, then only those k are
+    sorted, for O(n + k log k) in total.
+
+    :param arr: The array to partially sort.
+    :param k: The number of smallest items to sort.
+    """
+    arr = as_buffer(arr)
+    k = min(k, len(arr))
+    if k <= 0:
+        return
+    if k < len(arr):
+        nth_element(arr, k - 1)
+    quick_sort(arr, 0, k - 1)
+
+def top_k(items, k, largest=True):
+    """
+    Returns the k largest (or smallest) items in order, keeping only a k-item heap.
+
+    items can be any iterable, including a stream too large to hold in memory: a min-heap
+    of the k largest seen so far (a max-heap for the smallest) replaces its root whenever
+    a better item arrives. O(n log k) time, O(k) space.
+
+    :param items: The items to select from.
+    :param k: The number of items to return.
+    :param largest: Whether to return the largest items (largest first) or the smallest (smallest first).
+    :return: A list of at most k items.
+    """
+    if k <= 0:
+        return []
+    it = iter(items)
+    heap = list(islice(it, k))
+    sift = heapify_min if largest else heapify
+    n = len(heap)
+    for i in range((n - 2) // 2, -1, -1):
+        sift(heap, n, i)
+    if largest:
+        for item in it:
+            if heap[0] < item:
+                heap[0] = item
+                sift(heap, n, 0)
+    else:
+        for item in it:
+            if item < heap[0]:
+                heap[0] = item
+                sift(heap, n, 0)
+
+    # Pop the root to the back repeatedly: the best item ends up first
+    for i in range(n - 1, 0, -1):
+        heap[0], heap[i] = heap[i], heap[0]
+        sift(heap, i, 0)
+    return heap
+
+def run_tests(size, k_values, rep, seed=None, plot=True, output=None):
+    """
+    Compares the partial sorts with a full quick sort over a range of k.
+
+    :param size: The size of the arrays.
+    :param k_values: The values of k to test.
+    :param rep: The number of repetitions for each test.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary containing the average time taken by each method for each k.
+    """
+    from workload import generate_array
+    from timing import measure_time
+    from report import plot_results
+
+    arr = generate_array(size, 0.5, seed=seed)
+    methods = {
+        "quick_sort (full)": lambda k: quick_sort,
+        "partial_sort": lambda k: lambda a: partial_sort(a, k),
+        "top_k (smallest)": lambda k: lambda a: top_k(a, k, largest=False),
+        "nth_element": lambda k: lambda a: nth_element(a, k - 1),
+    }
+    results = {name: [] for name in methods}
+    for k in k_values:
+        for name, make in methods.items():
+            avg_time = sum(measure_time(make(k), arr) for _ in range(rep)) / rep
+            results[name].append(avg_time)
+            print(f'k: {k}, {name}, Avg Time: {avg_time:.5f}')
+
+    if plot:
+        plot_results(k_values, results, f'Partial Sorting ({size} elements)', xlabel='k', label="{}",
+                     output=output, index_name="k")
+    return results
+
+if __name__ == "__main__":
+    size = 100000  # Number of entries to select from
+    k_values = [1, 10, 100, 1000, 10000, 100000]  # Values of k to test
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(size, k_values, rep)  # Run tests
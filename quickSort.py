@@ -1,72 +1,105 @@
-import random
-import time
-import numpy as np
-import matplotlib.pyplot as plt
+from heapSort import heap_sort
+from insertionSort import binary_insertion_sort
+from buffers import as_buffer
 
-def partition(arr, low, high):
+INSERTION_CUTOFF = 16  # Segments this small are finished with insertion sort
+NINTHER_CUTOFF = 40  # Segments this large pick the pivot with Tukey's ninther
+
+def _median_of_three(arr, a, b, c):
     """
-    Helper function to partition the array around a pivot.
-    
+    Returns whichever of the indices a, b and c holds the median value.
+    """
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+def choose_pivot(arr, low, high):
+    """
+    Picks a pivot index with median-of-three, or the ninther for large segments.
+
     :param arr: The array to partition.
     :param low: The starting index of the partition range.
     :param high: The ending index of the partition range.
-    :return: The index of the pivot element after partitioning.
+    :return: The index of the chosen pivot.
     """
-    pivot = arr[high]  # Pivot element
-    i = low - 1  # Index of smaller element
-    for j in range(low, high):
-        if arr[j] <= pivot:
-            i += 1
-            arr[i], arr[j] = arr[j], arr[i]  # Swap if element is smaller than or equal to pivot
-    arr[i + 1], arr[high] = arr[high], arr[i + 1]  # Place pivot in correct position
-    return i + 1  # Return pivot index
+    mid = (low + high) // 2
+    if high - low + 1 < NINTHER_CUTOFF:
+        return _median_of_three(arr, low, mid, high)
+    step = (high - low + 1) // 8
+    return _median_of_three(arr,
+                            _median_of_three(arr, low, low + step, low + 2 * step),
+                            _median_of_three(arr, mid - step, mid, mid + step),
+                            _median_of_three(arr, high - 2 * step, high - step, high))
 
-def quick_sort(arr, low, high):
-    """
-    Implementation of the quick sort algorithm.
-    
-    :param arr: The array to be sorted.
-    :param low: The starting index of the array segment to be sorted.
-    :param high: The ending index of the array segment to be sorted.
+def partition(arr, low, high):
     """
-    if low < high:
-        pi = partition(arr, low, high)  # Partition index
-        quick_sort(arr, low, pi - 1)  # Recursively sort elements before partition
-        quick_sort(arr, pi + 1, high)  # Recursively sort elements after partition
+    Three-way (Dutch national flag) partition of arr[low..high] around a chosen pivot.
 
-def generate_array(size, presortedness):
-    """
-    Generates an array of the given size with a specified level of presortedness.
-    
-    :param size: The size of the array to generate.
-    :param presortedness: The degree to which the array is presorted (0 to 1).
-    :return: A list of integers.
+    Afterwards arr[low..lt-1] < pivot, arr[lt..gt] == pivot and arr[gt+1..high] > pivot,
+    so runs of keys equal to the pivot never need to be looked at again.
+
+    :param arr: The array to partition.
+    :param low: The starting index of the partition range.
+    :param high: The ending index of the partition range.
+    :return: The bounds (lt, gt) of the block equal to the pivot.
     """
-    arr = list(range(size))
-    if presortedness == 0:
-        arr.reverse()  # Reverse the array for minimum presortedness
-    elif presortedness == 1:
-        pass  # Already sorted array for maximum presortedness
-    else:
-        random.shuffle(arr)  # Shuffle the array for random disorder
-        presorted_elements = int(size * presortedness)
-        arr[:presorted_elements] = sorted(arr[:presorted_elements])  # Partially sort based on presortedness
-    return arr
+    pivot = arr[choose_pivot(arr, low, high)]  # Pivot element
+    lt, i, gt = low, low, high
+    while i <= gt:
+        item = arr[i]
+        if item < pivot:
+            arr[i] = arr[lt]  # Move the smaller element to the front block
+            arr[lt] = item
+            lt += 1
+            i += 1
+        elif pivot < item:
+            arr[i] = arr[gt]  # Move the larger element to the back block
+            arr[gt] = item
+            gt -= 1
+        else:
+            i += 1
+    return lt, gt
 
-def measure_time(func, *args):
+def quick_sort(arr, low=0, high=None):
     """
-    Measures the time taken to execute a given function with the provided arguments.
-    
-    :param func: The function to measure.
-    :param args: The arguments to pass to the function.
-    :return: The time taken in seconds.
+    Implementation of the quick sort algorithm as an introsort.
+
+    Partitions three ways around a median-of-three or ninther pivot, keeps pending
+    segments on an explicit stack and always continues with the smaller side, so the
+    stack holds O(log n) segments. Segments that exceed a depth of 2*log2(n) are heap
+    sorted, bounding the worst case at O(n log n), and small ones are insertion sorted.
+
+    :param arr: The array to be sorted.
+    :param low: The starting index of the array segment to be sorted.
+    :param high: The ending index of the array segment to be sorted (defaults to the last index).
     """
-    start = time.time()  # Start time
-    func(*args)  # Execute function
-    end = time.time()  # End time
-    return end - start  # Time taken
+    arr = as_buffer(arr)
+    if high is None:
+        high = len(arr) - 1
+    stack = [(low, high, 2 * max(high - low + 1, 1).bit_length())]  # (low, high, depth budget)
+    while stack:
+        low, high, depth = stack.pop()
+        while high - low + 1 > INSERTION_CUTOFF:
+            if depth == 0:
+                heap_sort(arr, low=low, high=high)  # Too many bad pivots, fall back to heap sort
+                break
+            depth -= 1
+            lt, gt = partition(arr, low, high)  # Partition bounds
+            # Defer the larger side and keep going with the smaller one
+            if lt - low < high - gt:
+                stack.append((gt + 1, high, depth))
+                high = lt - 1
+            else:
+                stack.append((low, lt - 1, depth))
+                low = gt + 1
+        else:
+            binary_insertion_sort(arr, low, high)
 
-def run_tests(values_start, values_stop, steps, presortedness_values, rep):
+def run_tests(values_start, values_stop, steps, presortedness_values, rep, workers=1, seed=None, store=None, plot=True, output=None):
     """
     Runs tests on the quick sort algorithm with varying array sizes and presortedness levels.
     
@@ -75,34 +108,26 @@ def run_tests(values_start, values_stop, steps, presortedness_values, rep):
     :param steps: The number of intervals to divide the size range.
     :param presortedness_values: A list of presortedness levels to test.
     :param rep: The number of repetitions for each test.
+    :param workers: The number of worker processes to spread the tests over.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param store: A ResultStore that keeps finished cells on disk and skips cells already run.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
     :return: A dictionary containing the average time taken for each presortedness level.
     """
-    results = {level: [] for level in presortedness_values}  # Initialize results dictionary
+    from gridRunner import run_grid  # Harness imports stay out of the kernels' import path
+    from workload import generate_array
+    from timing import measure_time
+    from report import plot_results
+
     step_size = (values_stop - values_start) // steps  # Calculate step size
     sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
     
-    for size in sizes:
-        for presortedness in presortedness_values:
-            times = []
-            for _ in range(rep):
-                arr = generate_array(size, presortedness)  # Generate array
-                arr_copy = arr[:]  # Copy array to avoid in-place sorting issues
-                time_taken = measure_time(quick_sort, arr_copy, 0, len(arr_copy) - 1)  # Measure time taken to sort
-                times.append(time_taken)  # Record time
-            avg_time = sum(times) / rep  # Calculate average time
-            results[presortedness].append(avg_time)  # Store average time
-            print(f'Size: {size}, Presortedness: {presortedness}, Avg Time: {avg_time:.5f}')  # Print results
+    results = run_grid(quick_sort, generate_array, measure_time, sizes, presortedness_values, rep, workers, seed=seed, store=store)  # Time every cell
     
-    # Plot results
-    for presortedness, times in results.items():
-        plt.plot(sizes, times, label=f"Presortedness = {presortedness}")
-
-    plt.xlabel('Array Size')
-    plt.ylabel('Time (seconds)')
-    plt.title('Quick Sort Performance')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    if plot:
+        plot_results(sizes, results, 'Quick Sort Performance', output=output)
+    return results
 
 if __name__ == "__main__":
     # Define parameters
@@ -111,5 +136,6 @@ if __name__ == "__main__":
     steps = 100  # Number of intervals
     presortedness_values = [0, 0.5, 1]  # Presortedness levels to test
     rep = 5  # Number of repetitions for each test
+    workers = 1  # Number of worker processes
     
-    run_tests(values_start, values_stop, steps, presortedness_values, rep)  # Run tests
+    run_tests(values_start, values_stop, steps, presortedness_values, rep, workers)  # Run tests
@@ -0,0 +1,226 @@
+import numpy as np
+from insertionSort import binary_insertion_sort
+
+RADIX_MIN_SIZE = 256  # Below this, converting to numpy costs more than a comparison sort
+COUNTING_RANGE_FACTOR = 2  # Counting sort when the key range is at most this many times the size
+COUNTING_MAX_RANGE = 1 << 20  # Widest histogram counting_sort builds for inputs smaller than the range
+MSD_CUTOFF = 32  # MSD buckets this small are finished with insertion sort
+SIGN_BIT = np.uint64(1 << 63)
+
+def _load(arr):
+    """
+    Returns the keys of an integer array as a numpy array, and a function that writes
+    sorted keys back into arr.
+
+    :raises TypeError: If arr does not hold integers.
+    """
+    if isinstance(arr, np.ndarray):
+        keys = arr
+    elif isinstance(arr, list):
+        keys = np.array(arr)
+    else:
+        keys = np.asarray(memoryview(arr))  # A view of array.array, bytearray or memoryview memory
+    if keys.dtype.kind not in "iu" or keys.ndim != 1:
+        raise TypeError(f"Integer sorts need a 1-D array of integers, not {keys.dtype}")
+
+    def write(values):
+        if isinstance(arr, list):
+            arr[:] = values.tolist()
+        else:
+            keys[:] = values
+    return keys, write
+
+def _to_unsigned(keys):
+    """
+    Maps keys to uint64 offsets from their minimum, preserving order.
+
+    Flipping the sign bit orders int64 values as uint64 values.
+
+    :return: The offsets and the minimum, for _from_unsigned.
+    """
+    if keys.dtype.kind == "i":
+        work = keys.astype(np.int64).view(np.uint64) ^ SIGN_BIT
+    else:
+        work = keys.astype(np.uint64)
+    low = work.min()
+    return work - low, low
+
+def _from_unsigned(work, low, dtype):
+    work = work + low
+    if np.dtype(dtype).kind == "i":
+        return (work ^ SIGN_BIT).view(np.int64).astype(dtype)
+    return work.astype(dtype)
+
+def _digit_dtype(bits):
+    if not 1 <= bits <= 16:
+        raise ValueError("Digits must be 1 to 16 bits wide")
+    return np.uint8 if bits <= 8 else np.uint16
+
+def _scatter(work, digits, radix):
+    """
+    Stably reorders work by digit.
+
+    The histogram of the digits decides whether the pass can be skipped. numpy's stable
+    sort of 8- and 16-bit digits is itself a counting sort (histogram, prefix sums,
+    stable scatter) running in C, so no comparisons are made.
+
+    :return: The reordered array and the digit counts.
+    """
+    counts = np.bincount(digits, minlength=radix)
+    if counts.max() == len(work):
+        return work, counts  # Every key has the same digit
+    order = np.argsort(digits, kind="stable")
+    return work[order], counts
+
+def check_counting_range(span, n):
+    """
+    Raises ValueError if counting sort of n keys over a key range of span would need a
+    histogram far larger than the input.
+    """
+    if span > max(COUNTING_RANGE_FACTOR * n, COUNTING_MAX_RANGE):
+        raise ValueError(f"A key range of {span} is too wide to counting sort {n} keys; use lsd_radix_sort")
+
+def counting_sort(arr):
+    """
+    Sorts integers with a histogram of their values, for key ranges not much larger than n.
+
+    Runs in O(n + k) time and O(k) extra space for a key range of k.
+
+    :param arr: The array of integers to be sorted.
+    :raises ValueError: If the key range is too wide; see check_counting_range.
+    """
+    if len(arr) < 2:
+        return
+    keys, write = _load(arr)
+    work, low = _to_unsigned(keys)
+    span = int(work.max()) + 1
+    check_counting_range(span, len(work))
+    counts = np.bincount(work.astype(np.intp), minlength=span)
+    write(_from_unsigned(np.repeat(np.arange(span, dtype=np.uint64), counts), low, keys.dtype))
+
+def lsd_radix_sort(arr, bits=8):
+    """
+    Least-significant-digit radix sort of integers.
+
+    Every pass stably scatters the keys by one digit of `bits` bits, from the lowest
+    digit up; only as many passes as the key range needs are made, and passes in which
+    every key has the same digit are skipped. O(n * w / bits) time for w-bit keys.
+
+    :param arr: The array of integers to be sorted.
+    :param bits: The digit width, from 1 to 16 bits.
+    """
+    dtype = _digit_dtype(bits)
+    if len(arr) < 2:
+        return
+    keys, write = _load(arr)
+    work, low = _to_unsigned(keys)
+    mask = np.uint64((1 << bits) - 1)
+    for shift in range(0, int(work.max()).bit_length(), bits):
+        digits = ((work >> np.uint64(shift)) & mask).astype(dtype)
+        work, _ = _scatter(work, digits, 1 << bits)
+    write(_from_unsigned(work, low, keys.dtype))
+
+def msd_radix_sort(arr, bits=8, cutoff=MSD_CUTOFF):
+    """
+    Most-significant-digit radix sort of integers.
+
+    Keys are scattered by their top digit into buckets, and each bucket is scattered by
+    the next digit in turn, using an explicit stack. Buckets of `cutoff` keys or fewer are
+    finished with insertion sort, which avoids the per-bucket overhead on the many small
+    buckets near the bottom.
+
+    :param arr: The array of integers to be sorted.
+    :param bits: The digit width, from 1 to 16 bits.
+    :param cutoff: The bucket size below which insertion sort takes over.
+    """
+    dtype = _digit_dtype(bits)
+    if len(arr) < 2:
+        return
+    keys, write = _load(arr)
+    work, low = _to_unsigned(keys)
+    mask = np.uint64((1 << bits) - 1)
+    width = int(work.max()).bit_length()
+    stack = [(0, len(work), max(0, (width - 1) // bits * bits))]  # (lo, hi, shift of the digit)
+    while stack:
+        lo, hi, shift = stack.pop()
+        if hi - lo <= cutoff:
+            binary_insertion_sort(work, lo, hi - 1)
+            continue
+        segment = work[lo:hi]
+        digits = ((segment >> np.uint64(shift)) & mask).astype(dtype)
+        work[lo:hi], counts = _scatter(segment, digits, 1 << bits)
+        if shift == 0:
+            continue
+        start = lo
+        for count in counts[counts > 0].tolist():
+            if count > 1:
+                stack.append((start, start + count, shift - bits))
+            start += count
+    write(_from_unsigned(work, low, keys.dtype))
+
+def integer_sort(arr, fallback=None):
+    """
+    Sorts integer input with the cheapest linear-time sort, and anything else with fallback.
+
+    Small key ranges go to counting sort and wider ones to LSD radix sort; inputs that are
+    too small to repay the conversion, or do not hold integers, go to the fallback.
+
+    :param arr: The array to be sorted.
+    :param fallback: The comparison sort for other inputs (defaults to quick_sort).
+    """
+    if fallback is None:
+        from quickSort import quick_sort
+        fallback = quick_sort
+    n = len(arr)
+    if n < RADIX_MIN_SIZE:
+        return fallback(arr)
+    try:
+        keys, _ = _load(arr)
+    except (TypeError, ValueError, OverflowError):
+        return fallback(arr)
+    span = int(keys.max()) - int(keys.min()) + 1
+    if span <= COUNTING_RANGE_FACTOR * n:
+        return counting_sort(arr)
+    return lsd_radix_sort(arr, 8 if n < 2 ** 16 else 16)  # Wide digits only pay off on large inputs
+
+def run_tests(values_start, values_stop, steps, rep, seed=None, plot=True, output=None):
+    """
+    Compares the integer sorts with numpy's sort and quick_sort on random permutations.
+
+    :param values_start: The starting size of the arrays.
+    :param values_stop: The maximum size of the arrays.
+    :param steps: The number of intervals to divide the size range.
+    :param rep: The number of repetitions for each test.
+    :param seed: A seed that makes the generated arrays reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary containing the average time taken by each sort for each size.
+    """
+    from workload import generate_array
+    from timing import measure_time
+    from quickSort import quick_sort
+    from report import plot_results
+
+    step_size = max(1, (values_stop - values_start) // steps)  # Calculate step size
+    sizes = range(values_start, values_stop + 1, step_size)  # Generate sizes to test
+    sorts = {"counting_sort": counting_sort, "lsd_radix_sort": lsd_radix_sort, "msd_radix_sort": msd_radix_sort,
+             "integer_sort": integer_sort, "numpy sort": np.sort, "quick_sort": quick_sort}
+    results = {name: [] for name in sorts}
+    for i, size in enumerate(sizes):
+        arr = generate_array(size, 0.5, seed=None if seed is None else [seed, i], as_array=True)
+        for name, sort_func in sorts.items():
+            avg_time = sum(measure_time(sort_func, arr) for _ in range(rep)) / rep
+            results[name].append(avg_time)
+            print(f'Size: {size}, {name}, Avg Time: {avg_time:.5f}')
+
+    if plot:
+        plot_results(sizes, results, 'Integer Sort Performance', label="{}", output=output)
+    return results
+
+if __name__ == "__main__":
+    values_start = 10000  # Minimum number of entries to sort
+    values_stop = 1000000  # Maximum number of entries to sort
+    steps = 10  # Number of intervals
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(values_start, values_stop, steps, rep)  # Run tests
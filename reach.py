@@ -0,0 +1,46 @@
+import os
+import ast
+import types
+import inspect
+import textwrap
+import importlib
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def referenced_names(code):
+    """
+    Returns the global names a code object refers to, including those of the functions,
+    lambdas and comprehensions nested in it.
+    """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= referenced_names(const)
+    return names
+
+def in_repo(func):
+    """
+    Tells whether a function was defined in a module of this repository. Functions
+    compiled from a made-up file name, such as instrumented variants, are not.
+    """
+    path = func.__code__.co_filename
+    return os.path.isfile(path) and os.path.dirname(os.path.abspath(path)) == REPO_DIR
+
+def local_imports(func):
+    """
+    Resolves the names a function imports from modules of this repository inside its own
+    body, such as a default fallback sort imported on first use.
+
+    :return: A dictionary of name -> imported value.
+    """
+    found = {}
+    for node in ast.walk(ast.parse(textwrap.dedent(inspect.getsource(func)))):
+        if not isinstance(node, ast.ImportFrom) or node.level or not node.module:
+            continue
+        if not os.path.isfile(os.path.join(REPO_DIR, node.module.replace(".", os.sep) + ".py")):
+            continue  # Not a repo module
+        module = importlib.import_module(node.module)
+        for alias in node.names:
+            if hasattr(module, alias.name):
+                found[alias.asname or alias.name] = getattr(module, alias.name)
+    return found
@@ -0,0 +1,138 @@
+from importlib import import_module
+
+class Algorithm:
+    """
+    A registered sort and the traits it declares.
+
+    The function is imported on first use, so reading the registry stays cheap.
+    In-place algorithms sort their argument; the others return a sorted copy.
+    """
+    __slots__ = ("name", "module", "function", "in_place", "stable", "adaptive", "best", "average", "worst",
+                 "space", "description", "_func")
+
+    def __init__(self, name, module, function, in_place, stable, adaptive, best, average, worst, space, description):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.in_place = in_place
+        self.stable = stable
+        self.adaptive = adaptive
+        self.best = best
+        self.average = average
+        self.worst = worst
+        self.space = space
+        self.description = description
+        self._func = None
+
+    @property
+    def func(self):
+        if self._func is None:
+            self._func = getattr(import_module(self.module), self.function)
+        return self._func
+
+    @property
+    def title(self):
+        return self.name.replace("_", " ").title()
+
+    def sort(self, arr, key=None, reverse=False):
+        """
+        Sorts arr in place, optionally by key and/or in reverse.
+
+        With a key or reverse, the keys are cached and sorted with their positions by
+        keySort.sort_by_key, which makes every algorithm stable. Without either, the
+        function is called directly and keeps its own stability.
+
+        :param arr: The list or buffer to be sorted.
+        :param key: A function of one element returning its sort key.
+        :param reverse: Whether to sort in descending order.
+        :return: arr.
+        """
+        if key is None and not reverse:
+            result = self.func(arr)
+            if result is not None and result is not arr:
+                arr[:] = result  # Out-of-place sorts return a sorted copy
+            return arr
+        from keySort import sort_by_key
+        return sort_by_key(arr, self.func, key, reverse)
+
+    def traits(self):
+        return {"in_place": self.in_place, "stable": self.stable, "adaptive": self.adaptive,
+                "best": self.best, "average": self.average, "worst": self.worst, "space": self.space}
+
+    def __repr__(self):
+        return f"Algorithm({self.name!r}, {self.module}.{self.function})"
+
+ALGORITHMS = {}
+
+def register(name, module, function, in_place=True, stable=False, adaptive=False, best="n log n",
+             average="n log n", worst="n log n", space="1", description=""):
+    """
+    Adds an algorithm to the registry.
+
+    Complexity classes are written in terms of n, e.g. "n", "n log n" or "n^2".
+
+    :param name: The registry name.
+    :param module: The module that defines the function.
+    :param function: The name of the sort function in that module.
+    :param in_place: Whether it sorts its argument (otherwise it returns a sorted copy).
+    :param stable: Whether equal elements keep their order.
+    :param adaptive: Whether presorted input makes it faster.
+    :param best: The best-case time complexity.
+    :param average: The average-case time complexity.
+    :param worst: The worst-case time complexity.
+    :param space: The auxiliary space complexity.
+    :param description: A one-line description.
+    :return: The Algorithm.
+    """
+    if name in ALGORITHMS:
+        raise ValueError(f"Algorithm {name!r} is already registered")
+    algorithm = Algorithm(name, module, function, in_place, stable, adaptive, best, average, worst, space, description)
+    ALGORITHMS[name] = algorithm
+    return algorithm
+
+def get(name):
+    """
+    :return: The Algorithm registered under name.
+    """
+    try:
+        return ALGORITHMS[name]
+    except KeyError:
+        raise KeyError(f"Unknown algorithm {name!r}; choose from {', '.join(ALGORITHMS)}") from None
+
+def select(names=None, **traits):
+    """
+    Picks algorithms by name and by trait, e.g. select(stable=True, in_place=True).
+
+    :param names: The names to pick from (defaults to every algorithm).
+    :param traits: Trait values every picked algorithm must have.
+    :return: A list of Algorithms in registration order (or in the order of names).
+    """
+    algorithms = [get(name) for name in names] if names else list(ALGORITHMS.values())
+    return [a for a in algorithms if all(getattr(a, trait) == value for trait, value in traits.items())]
+
+register("insertion_sort", "insertionSort", "insertion_sort", stable=True, adaptive=True,
+         best="n", average="n^2", worst="n^2", description="Straight insertion sort")
+register("binary_insertion_sort", "insertionSort", "binary_insertion_sort", stable=True, adaptive=True,
+         best="n", average="n^2", worst="n^2", description="Insertion sort with binary search and block moves")
+register("shell_sort", "insertionSort", "shell_sort", adaptive=True,
+         best="n log n", average="n^4/3", worst="n^4/3", description="Shell sort with Ciura's gaps")
+register("selection_sort", "selectionSort", "selection_sort",
+         best="n^2", average="n^2", worst="n^2", description="Selection sort")
+register("merge_sort", "mergSort", "merge_sort", stable=True, space="n", description="Top-down merge sort on copied halves")
+register("merge_sort_bottom_up", "mergSort", "merge_sort_bottom_up", stable=True, adaptive=True, best="n", space="n",
+         description="Bottom-up merge sort with one buffer and insertion-sorted runs")
+register("heap_sort", "heapSort", "heap_sort", description="Binary heap sort")
+register("quick_sort", "quickSort", "quick_sort", best="n", space="log n",
+         description="Introsort: three-way quicksort with a heap sort fallback")
+register("hybrid_sort", "hybridSort", "hybrid_sort", stable=True, adaptive=True, best="n", space="n",
+         description="Timsort-style natural merge sort with galloping")
+register("counting_sort", "radixSort", "counting_sort", stable=True, best="n", average="n", worst="n", space="n",
+         description="Counting sort of integers with a small key range")
+register("lsd_radix_sort", "radixSort", "lsd_radix_sort", stable=True, best="n", average="n", worst="n", space="n",
+         description="LSD radix sort of integers, numpy histogram and scatter")
+register("msd_radix_sort", "radixSort", "msd_radix_sort", stable=True, best="n", average="n", worst="n", space="n",
+         description="MSD radix sort of integers with an insertion sort cutoff")
+register("integer_sort", "radixSort", "integer_sort", best="n", average="n", worst="n log n", space="n",
+         description="Counting or radix sort for integers, quick sort otherwise")
+register("out_of_place_quick_sort", "allInOne", "quick_sort", in_place=False, stable=True, best="n",
+         worst="n^2", space="n", description="List-comprehension quicksort that returns a new list")
@@ -0,0 +1,246 @@
+import sys
+import math
+import argparse
+from itertools import combinations
+
+IDENTITY = ("algorithm", "module", "workload", "measure", "size", "presortedness", "seed", "machine")  # Everything but the source
+EXACT_LIMIT = 20000  # Largest number of group splits the Mann-Whitney test enumerates before approximating
+
+def cell_identity(key, machine=True):
+    """
+    Identifies the cell a stored key measures, whatever the source of the algorithm, so
+    a run can be matched with the baseline of the same cell before the code changed.
+
+    :param key: A ResultStore key.
+    :param machine: Whether cells from different machines are kept apart.
+    :return: A hashable tuple.
+    """
+    return tuple(key.get(field) for field in IDENTITY if machine or field != "machine")
+
+def latest(records, machine=True):
+    """
+    Keeps the most recent record of every cell.
+
+    :param records: ResultStore records.
+    :param machine: Whether cells from different machines are kept apart.
+    :return: A dictionary of cell identity -> record.
+    """
+    cells = {}
+    for record in records:
+        identity = cell_identity(record["key"], machine)
+        if identity not in cells or record["created"] > cells[identity]["created"]:
+            cells[identity] = record
+    return cells
+
+def _median(values):
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    return ordered[mid] if len(ordered) % 2 else (ordered[mid - 1] + ordered[mid]) / 2
+
+def mann_whitney(baseline, current):
+    """
+    One-sided Mann-Whitney U test of whether current times tend to be larger than baseline ones.
+
+    The p-value is exact (every split of the pooled times is enumerated) when there are
+    at most EXACT_LIMIT splits, and from the tie-corrected normal approximation otherwise.
+    With n times on each side the smallest exact p-value is 1 / C(2n, n), so at least
+    4 reps per side are needed to get below 0.05.
+
+    :param baseline: The baseline times.
+    :param current: The new times.
+    :return: The U statistic of current and the p-value.
+    """
+    n, m = len(current), len(baseline)
+
+    def u_statistic(group, other):
+        return sum((a > b) + 0.5 * (a == b) for a in group for b in other)
+
+    u = u_statistic(current, baseline)
+    pooled = list(current) + list(baseline)
+    if math.comb(n + m, n) <= EXACT_LIMIT:
+        splits = 0
+        extreme = 0
+        for chosen in combinations(range(n + m), n):
+            picked = set(chosen)
+            group = [pooled[i] for i in chosen]
+            other = [pooled[i] for i in range(n + m) if i not in picked]
+            splits += 1
+            extreme += u_statistic(group, other) >= u
+        return u, extreme / splits
+    total = n + m
+    ties = {}
+    for value in pooled:
+        ties[value] = ties.get(value, 0) + 1
+    correction = sum(t ** 3 - t for t in ties.values()) / (total * (total - 1))
+    sigma = math.sqrt(n * m / 12 * (total + 1 - correction))
+    if sigma == 0:
+        return u, 1.0
+    z = (u - n * m / 2 - 0.5) / sigma  # Continuity corrected
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+def bootstrap_ratio(baseline, current, confidence=0.95, resamples=2000, seed=0):
+    """
+    Bootstrap confidence interval of median(current) / median(baseline).
+
+    :return: The ratio of the medians and the interval (low, high).
+    """
+    import numpy as np
+    base = np.asarray(baseline, dtype=np.float64)
+    new = np.asarray(current, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    ratios = (np.median(rng.choice(new, (resamples, len(new))), axis=1) /
+              np.median(rng.choice(base, (resamples, len(base))), axis=1))
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(ratios, [tail, 100 - tail])
+    return _median(current) / _median(baseline), (float(low), float(high))
+
+def compare_cell(baseline, current, threshold=0.05, method="bootstrap", confidence=0.95, alpha=0.05, seed=0):
+    """
+    Decides whether one cell got slower than its baseline by more than threshold.
+
+    With method="bootstrap" a cell regresses when the whole confidence interval of the
+    ratio of medians lies above 1 + threshold. With method="mannwhitney" it regresses
+    when the one-sided test rejects "no slower" at alpha and the ratio of medians is
+    above 1 + threshold. Improvements are the mirror image.
+
+    :param baseline: The baseline rep times.
+    :param current: The new rep times.
+    :param threshold: The relative slowdown that counts, e.g. 0.05 for 5%.
+    :param method: "bootstrap" or "mannwhitney".
+    :param confidence: The coverage of the bootstrap interval.
+    :param alpha: The significance level of the Mann-Whitney test.
+    :param seed: The seed of the bootstrap resampling.
+    :return: A dictionary with both medians, the ratio, its interval, the p-value (None for
+             bootstrap) and the verdict: "regression", "improvement" or "ok".
+    """
+    ratio, (low, high) = bootstrap_ratio(baseline, current, confidence, seed=seed)
+    p_value = None
+    if method == "bootstrap":
+        slower = low > 1 + threshold
+        faster = high < 1 / (1 + threshold)
+    elif method == "mannwhitney":
+        _, p_value = mann_whitney(baseline, current)
+        _, p_faster = mann_whitney(current, baseline)
+        slower = p_value < alpha and ratio > 1 + threshold
+        faster = p_faster < alpha and ratio < 1 / (1 + threshold)
+    else:
+        raise ValueError(f"Unknown method {method!r}")
+    verdict = "regression" if slower else "improvement" if faster else "ok"
+    return {"baseline": _median(baseline), "current": _median(current), "ratio": ratio, "ci_low": low,
+            "ci_high": high, "p_value": p_value, "verdict": verdict}
+
+def compare(baseline, current, threshold=0.05, method="bootstrap", confidence=0.95, alpha=0.05, min_time=1e-6,
+            machine=True, on_cell=None):
+    """
+    Compares the cells of a new run with the same cells of a baseline run.
+
+    Cells are matched on everything in their key except the algorithm source, so the
+    baseline can come from any earlier commit on the same machine (or any machine, with
+    machine=False) as long as the workload, timer, size, presortedness and seed agree.
+
+    :param baseline: A ResultStore holding the baseline run.
+    :param current: The new run: a ResultStore, whose latest record per cell is used, or a list of records.
+    :param threshold: The relative slowdown that counts, e.g. 0.05 for 5%.
+    :param method: "bootstrap" or "mannwhitney"; see compare_cell.
+    :param confidence: The coverage of the bootstrap interval.
+    :param alpha: The significance level of the Mann-Whitney test.
+    :param min_time: Cells whose baseline median is faster than this many seconds are
+                     skipped, being too short to compare reliably.
+    :param machine: Whether only cells measured on the same machine are compared.
+    :param on_cell: Called as on_cell(key, comparison) for every compared cell.
+    :return: A list of (key, comparison) pairs; comparison["verdict"] is also
+             "no baseline" or "too fast" for cells that were not tested.
+    """
+    base_cells = latest(baseline.cells.values(), machine)
+    records = current.cells.values() if hasattr(current, "cells") else current
+    results = []
+    for identity, record in sorted(latest(records, machine).items(), key=lambda item: repr(item[0])):
+        found = base_cells.get(identity)
+        if found is None:
+            comparison = {"verdict": "no baseline"}
+        elif _median(found["times"]) < min_time:
+            comparison = {"verdict": "too fast"}
+        else:
+            comparison = compare_cell(found["times"], record["times"], threshold, method, confidence, alpha)
+            comparison["baseline_source"] = found["key"]["source"]
+        results.append((record["key"], comparison))
+        if on_cell is not None:
+            on_cell(record["key"], comparison)
+    return results
+
+def print_comparison(key, comparison):
+    cell = f"{key['algorithm']}, Size: {key['size']}, Presortedness: {key['presortedness']}"
+    if "ratio" not in comparison:
+        print(f"{cell}: {comparison['verdict']}")
+        return
+    p_value = "" if comparison["p_value"] is None else f", p={comparison['p_value']:.3f}"
+    print(f"{cell}: {comparison['baseline']:.5f} -> {comparison['current']:.5f} s, ratio {comparison['ratio']:.3f} "
+          f"[{comparison['ci_low']:.3f}, {comparison['ci_high']:.3f}]{p_value}  {comparison['verdict']}")
+
+def report(results, threshold):
+    """
+    Prints a summary of compare() and returns the number of regressions.
+    """
+    verdicts = [comparison["verdict"] for _, comparison in results]
+    regressions = verdicts.count("regression")
+    print(f"{len(verdicts)} cells: {regressions} regressions beyond {threshold:.0%}, "
+          f"{verdicts.count('improvement')} improvements, {verdicts.count('ok')} unchanged, "
+          f"{verdicts.count('no baseline') + verdicts.count('too fast')} not compared")
+    return regressions
+
+def add_arguments(parser):
+    """
+    Adds the gate's options to an argument parser.
+    """
+    parser.add_argument("--threshold", type=float, default=0.05, help="Relative slowdown that fails the gate (default: 0.05)")
+    parser.add_argument("--method", choices=("bootstrap", "mannwhitney"), default="bootstrap",
+                        help="Bootstrap CI of the ratio of medians, or a one-sided Mann-Whitney U test")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Coverage of the bootstrap interval")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level of the Mann-Whitney test")
+    parser.add_argument("--min-time", type=float, default=1e-6, help="Skip cells whose baseline is faster than this (s)")
+    parser.add_argument("--any-machine", action="store_true", help="Also compare cells measured on other machines")
+
+def gate(baseline, current, args):
+    """
+    Runs compare() with the options from add_arguments() and prints every cell.
+
+    Besides regressions, the gate fails on every cell the baseline lacks and when no cell
+    was compared at all, so a wrong baseline or an empty run cannot pass unnoticed.
+
+    :return: The number of failures: regressions plus cells without a baseline, or 1 if
+             nothing was compared; 0 if the run passes.
+    """
+    results = compare(baseline, current, args.threshold, args.method, args.confidence, args.alpha, args.min_time,
+                      not args.any_machine, on_cell=print_comparison)
+    failures = report(results, args.threshold)
+    missing = sum(comparison["verdict"] == "no baseline" for _, comparison in results)
+    if missing:
+        print(f"FAILED: {missing} cells have no baseline in {baseline.path}")
+        failures += missing
+    if not any("ratio" in comparison for _, comparison in results):
+        print(f"FAILED: no cell was compared with {baseline.path}")
+        failures = max(failures, 1)
+    return failures
+
+def main(argv=None):
+    """
+    Compares two result stores and exits with status 1 if any cell regressed, lacks a
+    baseline, or if nothing could be compared.
+    """
+    from resultStore import ResultStore
+
+    parser = argparse.ArgumentParser(description="Fail when a benchmark run is slower than its baseline.")
+    parser.add_argument("baseline", help="Result store of the baseline run, e.g. from the previous commit")
+    parser.add_argument("current", help="Result store of the new run")
+    parser.add_argument("--algorithms", nargs="+", help="Only compare these algorithms (function names, e.g. integer_sort or integer_sort(fallback=quick_sort))")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    current = ResultStore(args.current).cells.values()
+    if args.algorithms:
+        current = [record for record in current  # By full name, or by the name of the wrapper
+                   if {record["key"]["algorithm"], record["key"]["algorithm"].split("(")[0]} & set(args.algorithms)]
+    failures = gate(ResultStore(args.baseline), current, args)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import os
+import re
+import sys
+import csv
+
+FIGURE_FORMATS = {".png", ".svg", ".pdf"}
+TABLE_FORMATS = {".csv"}
+MISSING_MARKERS = {"timeout": "x", "skipped": "o", "error": "D"}
+
+def _paths(output):
+    if output is None:
+        return []
+    return [output] if isinstance(output, (str, os.PathLike)) else list(output)
+
+def split_outputs(output):
+    """
+    Splits report paths by extension.
+
+    :param output: A path or a list of paths, or None.
+    :return: The table (.csv) paths and the figure (.png, .svg, .pdf) paths.
+    """
+    tables, figures = [], []
+    for path in _paths(output):
+        ext = os.path.splitext(os.fspath(path))[1].lower()
+        if ext in TABLE_FORMATS:
+            tables.append(path)
+        elif ext in FIGURE_FORMATS:
+            figures.append(path)
+        else:
+            raise ValueError(f"Unknown report format {ext!r} for {path}")
+    return tables, figures
+
+def headless():
+    """
+    Whether there is no display to show figures on, e.g. on a benchmark box or in a worker.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    return not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+def pyplot():
+    """
+    Imports matplotlib.pyplot on first use, switching to the non-interactive Agg
+    backend when headless() unless MPLBACKEND chooses one.
+    """
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        if headless() and not os.environ.get("MPLBACKEND"):
+            matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+def write_csv(path, index_name, index, columns):
+    """
+    Writes one row per index value and one column per series.
+
+    :param path: The CSV file to write.
+    :param index_name: The header of the first column, e.g. "size".
+    :param index: The values of the first column.
+    :param columns: A dictionary of column header -> list of values, one per index value.
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([index_name, *columns])
+        for i, value in enumerate(index):
+            writer.writerow([value, *(series[i] for series in columns.values())])
+
+def finish(fig, figures=None, title="figure"):
+    """
+    Saves fig to every figure path, or shows it when no path is given.
+
+    Without paths on a headless machine the figure is saved as <title>.png instead
+    of calling plt.show(), which would block or fail there.
+
+    :return: The paths written.
+    """
+    plt = pyplot()
+    if not figures:
+        if plt.get_backend().lower() != "agg":
+            plt.show()
+            return []
+        figures = [re.sub(r"[^\w]+", "_", title).strip("_").lower() + ".png"]
+    for path in figures:
+        fig.savefig(path, bbox_inches="tight")
+        print(f"Wrote {path}")
+    plt.close(fig)
+    return figures
+
+def plot_results(index, results, title, xlabel="Array Size", ylabel="Time (seconds)", label="Presortedness = {}",
+                 output=None, index_name="size", figsize=None, missing=None):
+    """
+    Reports a benchmark as one line per series.
+
+    :param index: The x values, e.g. the array sizes.
+    :param results: A dictionary of series key -> list of y values, e.g. run_grid results.
+    :param title: The title of the plot.
+    :param xlabel: The label of the x axis.
+    :param ylabel: The label of the y axis.
+    :param label: The format of each series label; it is given the series key.
+    :param output: Report path(s): .png/.svg/.pdf write the figure and .csv the table.
+                   With None the figure is shown, or saved when headless.
+    :param index_name: The header of the index column in CSV reports.
+    :param figsize: The figure size in inches.
+    :param missing: Cells that have no value, as a dictionary of series key -> {x: reason},
+                    e.g. from the scheduler's "timeout" and "skipped" cells. They are marked
+                    along the x axis of the plot and written as the reason in CSV reports.
+    :return: The paths written.
+    """
+    index = list(index)
+    missing = missing or {}
+    tables, figures = split_outputs(output)
+    written = []
+    for path in tables:
+        columns = {label.format(key): [missing.get(key, {}).get(x, value) if value is None else value
+                                       for x, value in zip(index, values)]
+                   for key, values in results.items()}
+        write_csv(path, index_name, index, columns)
+        written.append(path)
+    if figures or output is None:
+        plt = pyplot()
+        fig, ax = plt.subplots(figsize=figsize)
+        for key, values in results.items():
+            line, = ax.plot(index, [float("nan") if value is None else value for value in values], label=label.format(key))
+            for x, reason in missing.get(key, {}).items():
+                # Pin the mark to the bottom of the axes, whatever the time scale
+                ax.plot(x, 0, marker=MISSING_MARKERS.get(reason, "|"), color=line.get_color(), markersize=8,
+                        clip_on=False, transform=ax.get_xaxis_transform(), linestyle="none")
+        for reason, marker in MISSING_MARKERS.items():
+            if any(reason in cells.values() for cells in missing.values()):
+                ax.plot([], [], marker=marker, color="gray", linestyle="none", label=reason)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.legend()
+        ax.grid(True)
+        written += finish(fig, figures, title)
+    return written
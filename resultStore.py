@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import types
+import hashlib
+import inspect
+import platform
+from importlib import metadata
+from functools import partial
+from reach import referenced_names, in_repo, local_imports
+
+CONSTANT_TYPES = (int, float, str, bool, tuple, frozenset)  # Module constants that change a kernel's behaviour
+
+def source_hash(func):
+    """
+    Hashes the source of a function and of every repo function and module constant it reaches,
+    including functions it imports inside its body.
+
+    Editing a kernel, a helper it calls (e.g. partition or heapify) or a constant such as
+    INSERTION_CUTOFF changes the hash; editing unrelated code does not.
+
+    :param func: A function, or a functools.partial of one.
+    :return: A hex digest.
+    """
+    digest = hashlib.sha256()
+    seen = set()
+
+    def visit(value):
+        if isinstance(value, partial):
+            visit(value.func)
+            for name, arg in [(None, arg) for arg in value.args] + sorted(value.keywords.items()):
+                digest.update(repr(name).encode())
+                if isinstance(arg, (types.FunctionType, partial)):
+                    visit(arg)  # By source, since its repr holds a per-process address
+                else:
+                    digest.update(repr(arg).encode())
+            return
+        if not isinstance(value, types.FunctionType) or not in_repo(value):
+            digest.update(f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}".encode())
+            return
+        if value in seen:
+            return
+        seen.add(value)
+        digest.update(inspect.getsource(value).encode())
+        imported = local_imports(value)  # Names imported inside the body are not in its globals
+        for name in sorted(referenced_names(value.__code__) | set(imported)):
+            target = imported[name] if name in imported else value.__globals__.get(name)
+            if isinstance(target, (types.FunctionType, partial)):
+                visit(target)
+            elif isinstance(target, CONSTANT_TYPES):
+                digest.update(f"{name}={target!r}".encode())
+
+    visit(func)
+    return digest.hexdigest()
+
+def algorithm_name(sort_func):
+    """
+    Names a sort function, including what a functools.partial binds, e.g.
+    "integer_sort(fallback=quick_sort)", so wrappers around different kernels are told apart.
+    """
+    if isinstance(sort_func, partial):
+        bound = [algorithm_name(arg) for arg in sort_func.args]
+        bound += [f"{name}={algorithm_name(arg)}" for name, arg in sorted(sort_func.keywords.items())]
+        return f"{algorithm_name(sort_func.func)}({', '.join(bound)})"
+    if callable(sort_func):
+        return getattr(sort_func, "__qualname__", "")
+    return repr(sort_func)
+
+def _cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+def machine_fingerprint():
+    """
+    Describes the machine and interpreter, since timings are only comparable on the same setup.
+
+    :return: A dictionary of the CPU model, usable cores, OS, Python and numpy versions.
+    """
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    try:
+        numpy = metadata.version("numpy")  # Installed version, whether or not numpy was imported yet
+    except metadata.PackageNotFoundError:
+        numpy = None
+    return {"cpu": _cpu_model(), "cores": cores, "machine": platform.machine(), "system": platform.system(),
+            "python": f"{platform.python_implementation()} {platform.python_version()}", "numpy": numpy}
+
+class ResultStore:
+    """
+    An append-only JSONL log of benchmark cells, so sweeps survive crashes and skip work already done.
+
+    Each line holds one finished (size, presortedness) cell: its key and the rep times.
+    Later lines win, and a line cut short by a crash is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.machine = machine_fingerprint()
+        self.machine_id = hashlib.sha256(json.dumps(self.machine, sort_keys=True).encode()).hexdigest()[:16]
+        self.cells = {}
+        self._hashes = {}
+        self._described = False
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write from an interrupted run
+                    self.cells[record["id"]] = record
+                    self._described |= record["key"]["machine"] == self.machine_id
+
+    def _hash(self, func):
+        try:
+            return self._hashes[func]
+        except (KeyError, TypeError):
+            pass
+        value = source_hash(func)
+        try:
+            self._hashes[func] = value
+        except TypeError:
+            pass
+        return value
+
+    def key(self, sort_func, generate, measure, size, presortedness, seed):
+        """
+        Builds the cache key of one cell.
+
+        :return: A dictionary identifying the algorithm (its name, see algorithm_name, module and source), workload,
+                 timer, size, presortedness, seed and machine.
+        """
+        func = sort_func.func if isinstance(sort_func, partial) else sort_func
+        return {"algorithm": algorithm_name(sort_func), "module": getattr(func, "__module__", None), "source": self._hash(sort_func),
+                "workload": self._hash(generate), "measure": self._hash(measure), "size": size,
+                "presortedness": presortedness, "seed": seed, "machine": self.machine_id}
+
+    @staticmethod
+    def _id(key):
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """
+        :return: The stored record for key, or None if the cell has not been run.
+        """
+        return self.cells.get(self._id(key))
+
+    def put(self, key, times, operations=None, memory=None):
+        """
+        Appends a finished cell to the log and flushes it to disk straight away.
+
+        :param key: The key from key().
+        :param times: The rep times in seconds.
+        :param operations: The average operation counts, if they were collected.
+        :param memory: The average memory measurements, if they were collected.
+        """
+        record = {"id": self._id(key), "key": key, "times": list(times), "operations": operations,
+                  "memory": memory, "created": time.time()}
+        if not self._described:
+            record["machine"] = self.machine  # Describe each machine once
+            self._described = True
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.cells[record["id"]] = record
+        return record
+
+    def records(self, **match):
+        """
+        Iterates over the stored cells whose key matches every given field, e.g. algorithm="quick_sort".
+        """
+        for record in self.cells.values():
+            if all(record["key"].get(field) == value for field, value in match.items()):
+                yield record
@@ -0,0 +1,155 @@
+import time
+import multiprocessing
+from gridRunner import _run_cell, _cell_seed
+from timing import MIN_BATCH_TIME
+
+def _cell_worker(conn, sort_func, generate, measure, size, presortedness, rep, seed):
+    """
+    Runs one (size, presortedness) cell in a child process and sends back its rep times,
+    seeding every rep the way run_grid does so both share cached cells.
+    """
+    try:
+        times = [_run_cell((sort_func, generate, measure, 0, size, presortedness,
+                            None if seed is None else _cell_seed(seed, size, presortedness, rep_index), False, False))[2]
+                 for rep_index in range(rep)]
+        conn.send(("ok", times))
+    except Exception as e:
+        conn.send(("error", repr(e)))
+    finally:
+        conn.close()
+
+def run_cell(sort_func, generate, measure, size, presortedness, rep, timeout=None, seed=None, store=None):
+    """
+    Runs one cell in its own process and kills it if it misses the deadline.
+
+    The store stays in this process: a cached cell is returned without starting a child,
+    and the times of a finished one are sent back and written here.
+
+    :param timeout: The deadline in seconds, or None to wait for as long as it takes.
+    :param store: A ResultStore to read the cell from and write it to.
+    :return: A tuple (status, avg_time) where status is "ok", "timeout" or "error";
+             avg_time is None unless the cell finished.
+    """
+    key = None
+    if store is not None:
+        key = store.key(sort_func, generate, measure, size, presortedness, seed)
+        found = store.get(key)
+        if found and len(found["times"]) >= rep:
+            return "ok", sum(found["times"][:rep]) / rep
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_cell_worker, daemon=True,
+                                      args=(sender, sort_func, generate, measure, size, presortedness, rep, seed))
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            status, value = receiver.recv()
+        else:
+            status, value = "timeout", None
+    except EOFError:
+        status, value = "error", "worker exited without a result"
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        receiver.close()
+    if status == "error":
+        print(f"Size: {size}, Presortedness: {presortedness} failed: {value}")
+        return status, None
+    if status == "ok":
+        if key is not None:
+            store.put(key, value)
+        value = sum(value) / rep
+    return status, value
+
+def estimate_cell(sizes, times, size, rep):
+    """
+    Predicts how long a cell will take from the times already measured at smaller sizes.
+
+    With three or more points the best complexity fit is extrapolated. With fewer, every
+    two-constant model fits exactly, so the cost is assumed to grow quadratically from the
+    largest point and an unknown algorithm is not underestimated.
+    Each rep costs a warmup call plus a timed batch of at least MIN_BATCH_TIME.
+
+    :param sizes: The sizes measured so far.
+    :param times: Their average times per call in seconds.
+    :param size: The size of the cell to predict.
+    :param rep: The number of repetitions of the cell.
+    :return: The predicted wall-clock seconds of the cell (0 if nothing is known yet).
+    """
+    if not sizes:
+        return 0.0
+    per_call = None
+    if len(sizes) >= 3:
+        from complexityFit import fit, predict
+        try:
+            per_call = float(predict(fit(sizes, times)[0], size))
+        except ValueError:
+            pass  # Too few usable points, e.g. sizes 0 and 1
+    if per_call is None:
+        largest = max(range(len(sizes)), key=lambda i: sizes[i])
+        per_call = times[largest] * (size / max(sizes[largest], 1)) ** 2
+    return rep * (per_call + max(per_call, MIN_BATCH_TIME))
+
+def _print_status(size, presortedness, status, avg_time):
+    if status == "ok":
+        print(f'Size: {size}, Presortedness: {presortedness}, Avg Time: {avg_time:.5f}')
+    else:
+        print(f'Size: {size}, Presortedness: {presortedness}, {status}')
+
+def run_scheduled(sort_func, generate, measure, sizes, presortedness_values, rep, cell_timeout=None, budget=None,
+                  seed=None, store=None, on_cell=_print_status):
+    """
+    Times a sort over a grid like run_grid, but with a deadline per cell and a budget for the whole grid.
+
+    Sizes are run smallest first, each cell in its own process that is killed when it
+    misses its deadline (the cell timeout or what is left of the budget, whichever is
+    sooner). Before a cell starts, its cost is predicted from the smaller sizes of the
+    same presortedness; cells predicted to overrun the remaining budget are skipped, and
+    so are all larger sizes of a presortedness level once one of its cells times out,
+    fails or is skipped.
+
+    :param sort_func: The sort function to measure.
+    :param generate: The array generator, called as generate(size, presortedness, seed=seed).
+    :param measure: The timing function, called as measure(sort_func, arr).
+    :param sizes: The array sizes to test.
+    :param presortedness_values: A list of presortedness levels to test.
+    :param rep: The number of repetitions for each test.
+    :param cell_timeout: The deadline of one cell in seconds, or None.
+    :param budget: The wall-clock budget of the whole grid in seconds, or None.
+    :param seed: A seed that makes every generated array reproducible.
+    :param store: A ResultStore to read cached cells from and write finished cells to.
+    :param on_cell: Called as on_cell(size, presortedness, status, avg_time) after every cell.
+    :return: The average times in run_grid's format, with None for cells that did not run,
+             and a dictionary of (size, presortedness) -> "ok", "timeout", "skipped" or "error".
+    """
+    sizes = list(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    results = {level: [None] * len(sizes) for level in presortedness_values}
+    status = {}
+    measured = {level: ([], []) for level in presortedness_values}  # Sizes and times seen per level
+    stopped = set()  # Levels with a cell that did not finish
+    began = time.perf_counter()
+
+    for size_index in order:
+        size = sizes[size_index]
+        for presortedness in presortedness_values:
+            remaining = None if budget is None else budget - (time.perf_counter() - began)
+            deadline = min((t for t in (cell_timeout, remaining) if t is not None), default=None)
+            if presortedness in stopped or (remaining is not None and remaining <= 0):
+                cell_status, avg_time = "skipped", None
+            elif remaining is not None and estimate_cell(*measured[presortedness], size, rep) > remaining:
+                cell_status, avg_time = "skipped", None  # Predicted to blow the budget
+            else:
+                cell_status, avg_time = run_cell(sort_func, generate, measure, size, presortedness, rep,
+                                                 deadline, seed, store)
+            if cell_status == "ok":
+                results[presortedness][size_index] = avg_time
+                measured[presortedness][0].append(size)
+                measured[presortedness][1].append(avg_time)
+            else:
+                stopped.add(presortedness)
+            status[(size, presortedness)] = cell_status
+            if on_cell is not None:
+                on_cell(size, presortedness, cell_status, avg_time)
+    return results, status
@@ -0,0 +1,374 @@
+import math
+import json
+import time
+import signal
+import struct
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import registry
+
+# Every request is a header, the algorithm name in ASCII and the items as little-endian int64.
+# Every response is a header and either the sorted items or, for errors and stats, UTF-8 text.
+# The name picks the kernel only for requests longer than batchSort.NETWORK_MAX_WIDTH (64)
+# items: shorter ones are batched and sorted by shared sorting networks, whatever they name.
+# A stats request carries no items.
+REQUEST = struct.Struct("<BQ")  # Length of the algorithm name, number of items
+RESPONSE = struct.Struct("<BQ")  # Status, number of items (or bytes of text)
+STATUS_OK, STATUS_ERROR, STATUS_STATS = 0, 1, 2
+STATS_REQUEST = "stats"  # Algorithm name that asks for the service statistics instead
+ITEM = np.dtype("<i8")
+
+LARGE_ITEMS = 4096  # Requests at least this long go to the process pool, smaller ones are batched
+BATCH_ITEMS = 65536  # Most items coalesced into one batch
+BATCH_DELAY = 0.0002  # Seconds a batch waits for more requests once its first one arrived
+QUEUE_SIZE = 1024  # Requests waiting per queue before readers stop reading
+MAX_ITEMS = 1 << 27  # Largest request accepted (1 GiB of int64)
+
+class LatencyHistogram:
+    """
+    Latencies in logarithmic buckets, 100 per decade from 1 microsecond, so percentiles
+    are accurate to about 2.3% in constant memory however many requests are recorded.
+    """
+    FLOOR = 1e-6
+    PER_DECADE = 100
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        bucket = max(0, math.ceil(math.log10(max(seconds, self.FLOOR) / self.FLOOR) * self.PER_DECADE))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, p):
+        """
+        :param p: The percentile, from 0 to 100.
+        :return: The upper bound of the bucket holding it, in seconds (0 when empty).
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(p / 100 * self.count)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.FLOOR * 10 ** (bucket / self.PER_DECADE), self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99), "max": self.max}
+
+def encode_request(name, arr):
+    """
+    Frames one sort request.
+
+    :param name: The registered algorithm name.
+    :param arr: The integers to sort.
+    :return: The bytes to send.
+    """
+    items = np.ascontiguousarray(arr, dtype=ITEM)
+    label = name.encode("ascii")
+    return REQUEST.pack(len(label), len(items)) + label + items.tobytes()
+
+async def read_response(reader):
+    """
+    Reads one response frame.
+
+    :return: The sorted numpy array, or the statistics dictionary for a stats request.
+    :raises RuntimeError: If the service reported an error.
+    """
+    status, count = RESPONSE.unpack(await reader.readexactly(RESPONSE.size))
+    if status == STATUS_OK:
+        return np.frombuffer(await reader.readexactly(count * ITEM.itemsize), dtype=ITEM)
+    text = (await reader.readexactly(count)).decode()
+    if status == STATUS_STATS:
+        return json.loads(text)
+    raise RuntimeError(text)
+
+def _sort_shared(name, memory_name, count):
+    """
+    Sorts count int64 items in a shared memory block in place; runs in a pool worker.
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        arr = np.ndarray((count,), dtype=ITEM, buffer=memory.buf)
+        registry.get(name).sort(arr)
+        del arr  # Release the view so the block can be closed
+    finally:
+        memory.close()
+
+def _sort_batch(jobs):
+    """
+    Sorts the arrays of many small requests together; runs in the batch thread.
+
+    The requests of each algorithm are laid end to end and sorted as one ragged array,
+    so rows up to NETWORK_MAX_WIDTH long share vectorized sorting networks, whichever
+    algorithm they named, and longer ones are sorted by the algorithm itself. If a group fails, its requests are sorted
+    one at a time, and only those that fail again get their error in job.error.
+    """
+    from batchSort import sort_ragged
+    by_name = {}
+    for job in jobs:
+        by_name.setdefault(job.name, []).append(job)
+    for name, group in by_name.items():
+        kernel = registry.get(name).func
+        try:
+            offsets = np.zeros(len(group) + 1, dtype=np.intp)
+            np.cumsum([len(job.items) for job in group], out=offsets[1:])
+            values = np.concatenate([job.items for job in group])
+            sort_ragged(values, offsets, kernel=kernel)
+        except Exception:
+            for job in group:
+                try:
+                    job.items = sort_ragged(job.items.copy(), np.array([0, len(job.items)]), kernel=kernel)
+                except Exception as e:
+                    job.error = e
+            continue
+        for job, start, end in zip(group, offsets[:-1], offsets[1:]):
+            job.items = values[start:end]
+
+class _Job:
+    __slots__ = ("name", "items", "future", "error")
+
+    def __init__(self, name, items, future):
+        self.name = name
+        self.items = items
+        self.future = future
+        self.error = None  # Set by _sort_batch if this request failed on its own
+
+class SortService:
+    """
+    Sorts int64 arrays for clients of an asyncio server.
+
+    Small requests wait in a bounded queue and are coalesced into batches, sorted in one
+    thread so the event loop keeps serving. Large ones wait in another bounded queue and
+    are copied once into shared memory, sorted there in place by a process pool and read
+    back, so no pickled copies cross the process boundary. When a queue is full, the
+    connections that feed it stop being read, which pushes back on their clients.
+    """
+
+    def __init__(self, workers=1, large_items=LARGE_ITEMS, batch_items=BATCH_ITEMS, batch_delay=BATCH_DELAY,
+                 queue_size=QUEUE_SIZE, max_items=MAX_ITEMS):
+        self.workers = workers
+        self.large_items = large_items
+        self.batch_items = batch_items
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.max_items = max_items
+        self.latency = {"batched": LatencyHistogram(), "pool": LatencyHistogram()}
+        self.batches = 0
+        self.tasks = []
+        self.connections = {}  # Writer -> the task serving it
+
+    async def start(self):
+        self.small = asyncio.Queue(self.queue_size)
+        self.large = asyncio.Queue(self.queue_size)
+        self.thread = ThreadPoolExecutor(1)
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.tasks = [asyncio.create_task(self._batcher())]
+        self.tasks += [asyncio.create_task(self._pool_feeder()) for _ in range(self.workers)]
+
+    async def close(self):
+        handlers = list(self.connections.values())
+        for writer in list(self.connections):
+            writer.close()  # Their handlers see the end of the stream and return
+        await asyncio.gather(*handlers, return_exceptions=True)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.thread.shutdown()
+        self.pool.shutdown()
+
+    def stats(self):
+        summary = {path: histogram.summary() for path, histogram in self.latency.items()}
+        total = LatencyHistogram()
+        for histogram in self.latency.values():
+            total.merge(histogram)
+        summary["all"] = total.summary()
+        summary["batches"] = self.batches
+        summary["queued"] = {"batched": self.small.qsize(), "pool": self.large.qsize()}
+        return summary
+
+    async def sort(self, name, items):
+        """
+        Queues items for sorting, waiting for room if the queue is full.
+
+        :param name: The registered algorithm name.
+        :param items: A numpy array of int64.
+        :return: The sorted items.
+        :raises KeyError: If name is not a registered algorithm.
+        :raises Exception: Whatever the algorithm raised for these items, e.g. ValueError from counting_sort.
+        """
+        registry.get(name)  # Unknown names fail before queueing
+        job = _Job(name, items, asyncio.get_running_loop().create_future())
+        await (self.large if len(items) >= self.large_items else self.small).put(job)
+        return await job.future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.small.get()]
+            items = len(batch[0].items)
+            deadline = loop.time() + self.batch_delay
+            while items < self.batch_items:
+                try:
+                    job = self.small.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        job = await asyncio.wait_for(self.small.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(job)
+                items += len(job.items)
+            try:
+                await loop.run_in_executor(self.thread, _sort_batch, batch)
+            except Exception as e:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                continue
+            self.batches += 1
+            for job in batch:
+                if job.future.done():
+                    continue
+                if job.error is not None:
+                    job.future.set_exception(job.error)
+                else:
+                    job.future.set_result(job.items)
+
+    async def _pool_feeder(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.large.get()
+            memory = shared_memory.SharedMemory(create=True, size=job.items.nbytes)
+            try:
+                shared = np.ndarray(job.items.shape, dtype=ITEM, buffer=memory.buf)
+                shared[:] = job.items
+                await loop.run_in_executor(self.pool, _sort_shared, job.name, memory.name, len(job.items))
+                result = shared.copy()
+                del shared
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                memory.close()
+                memory.unlink()
+
+    async def handle(self, reader, writer):
+        """
+        Serves one connection: requests are answered in order until the client disconnects.
+        """
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    length, count = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+                except asyncio.IncompleteReadError:
+                    break
+                name = (await reader.readexactly(length)).decode("ascii", "replace")
+                if count > self.max_items:
+                    text = f"{count} items is more than the limit of {self.max_items}".encode()
+                    writer.write(RESPONSE.pack(STATUS_ERROR, len(text)) + text)
+                    await writer.drain()
+                    break  # The payload was not read, so the stream cannot be resynchronized
+                payload = await reader.readexactly(count * ITEM.itemsize)  # Read even if unused, to stay in step
+                if name == STATS_REQUEST:
+                    if count:
+                        text = b"A stats request carries no items"
+                        writer.write(RESPONSE.pack(STATUS_ERROR, len(text)) + text)
+                    else:
+                        text = json.dumps(self.stats()).encode()
+                        writer.write(RESPONSE.pack(STATUS_STATS, len(text)) + text)
+                    await writer.drain()
+                    continue
+                began = time.perf_counter()
+                try:
+                    result = await self.sort(name, np.frombuffer(payload, dtype=ITEM))
+                except Exception as e:
+                    text = (e.args[0] if isinstance(e, KeyError) and e.args else repr(e)).encode()
+                    writer.write(RESPONSE.pack(STATUS_ERROR, len(text)) + text)
+                else:
+                    writer.write(RESPONSE.pack(STATUS_OK, len(result)))
+                    writer.write(result.data)
+                    path = "pool" if count >= self.large_items else "batched"
+                    self.latency[path].record(time.perf_counter() - began)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self.connections[writer]
+            writer.close()
+
+async def serve(service, unix=None, host="127.0.0.1", port=0):
+    """
+    Starts service and an asyncio server for it, on a Unix socket if a path is given and
+    on localhost TCP otherwise.
+
+    :return: The asyncio server; its sockets tell the port picked for port=0.
+    """
+    await service.start()
+    if unix:
+        return await asyncio.start_unix_server(service.handle, path=unix)
+    return await asyncio.start_server(service.handle, host, port)
+
+def print_stats(stats):
+    for path in ("batched", "pool", "all"):
+        s = stats[path]
+        print(f"{path:<8} {s['count']:>8} requests  p50 {s['p50'] * 1e3:8.3f} ms  p99 {s['p99'] * 1e3:8.3f} ms  "
+              f"max {s['max'] * 1e3:8.3f} ms")
+    print(f"{stats['batches']} batches")
+
+async def _main(args):
+    service = SortService(args.workers, args.large_items, args.batch_items, args.batch_delay, args.queue_size)
+    server = await serve(service, args.unix, args.host, args.port)
+    where = args.unix or "{}:{}".format(*server.sockets[0].getsockname()[:2])
+    print(f"Sorting on {where}", flush=True)
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)  # Stop cleanly and print the latencies
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        print_stats(service.stats())
+        await service.close()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Serve the registered sorting algorithms over a socket.")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes sorting large requests")
+    parser.add_argument("--large-items", type=int, default=LARGE_ITEMS, help="Smallest request sent to the pool")
+    parser.add_argument("--batch-items", type=int, default=BATCH_ITEMS, help="Most items in one batch")
+    parser.add_argument("--batch-delay", type=float, default=BATCH_DELAY, help="Seconds a batch waits to fill")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Requests queued before pushing back")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    asyncio.run(_main(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import os
+import time
+import pickle
+import tempfile
+from itertools import islice
+
+def merge_sorted(*iterables, stats=None):
+    """
+    Lazily merges sorted iterables with a loser tree.
+
+    Only the current head of each input is held, so already-sorted streams are merged
+    without buffering, and the first item is yielded as soon as every input has produced
+    one. Each item after that costs log2(k) comparisons, one per level of the tree.
+    Ties go to the earlier input, so the merge is stable.
+
+    :param iterables: Sorted iterables.
+    :param stats: If a dictionary is given, "items" is set to the number of items yielded.
+    :return: A generator of the merged items.
+    """
+    sources = [iter(it) for it in iterables]
+    k = len(sources)
+    heads = [None] * k
+    done = [False] * k
+    for i, source in enumerate(sources):
+        try:
+            heads[i] = next(source)
+        except StopIteration:
+            done[i] = True
+
+    def beats(a, b):
+        if done[a]:
+            return False
+        if done[b]:
+            return True
+        if heads[b] < heads[a]:
+            return False
+        return heads[a] < heads[b] or a < b  # Earlier input wins ties
+
+    # Play the initial tournament: tree[node] keeps the loser, winners move up
+    tree = [0] * k
+    winners = [0] * k + list(range(k))
+    for node in range(k - 1, 0, -1):
+        left, right = winners[2 * node], winners[2 * node + 1]
+        if beats(left, right):
+            winners[node], tree[node] = left, right
+        else:
+            winners[node], tree[node] = right, left
+    winner = winners[1] if k else None
+
+    count = 0
+    while k and not done[winner]:
+        yield heads[winner]
+        count += 1
+        try:
+            heads[winner] = next(sources[winner])
+        except StopIteration:
+            done[winner] = True
+            heads[winner] = None
+        # Replay the path from the winner's leaf to the root against the stored losers
+        node = (winner + k) // 2
+        while node:
+            if beats(tree[node], winner):
+                tree[node], winner = winner, tree[node]
+            node //= 2
+    if stats is not None:
+        stats["items"] = count
+
+def _spill(run, tmp_dir, block_items):
+    """
+    Writes a sorted run to a temporary file as pickled blocks.
+
+    :return: The path of the file.
+    """
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(run), block_items):
+            pickle.dump(run[start:start + block_items], f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+def _read_run(path, held):
+    """
+    Yields a spilled run back one block at a time, adding the items it holds to held[0].
+    """
+    with open(path, "rb") as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                return
+            held[0] += len(block)
+            try:
+                yield from block
+            finally:
+                held[0] -= len(block)
+
+def stream_sort(items, chunk_size=65536, sort_func=None, spill=False, tmp_dir=None, block_items=1024, stats=None):
+    """
+    Sorts any iterable, reading it in bounded chunks and merging the sorted chunks lazily.
+
+    Each chunk of chunk_size items is sorted with sort_func and kept as a run, or with
+    spill=True written to a temporary file so only one chunk is in memory while reading.
+    Once the input is exhausted the runs are k-way merged through merge_sorted, so the
+    returned generator starts yielding without a final pass over the whole input. To
+    merge inputs that are already sorted, use merge_sorted directly; nothing is buffered.
+
+    :param items: The items to sort.
+    :param chunk_size: The number of items read and sorted at a time.
+    :param sort_func: Sorts a list in place, or returns it sorted; defaults to hybrid_sort.
+    :param spill: Whether to write the sorted chunks to temporary files.
+    :param tmp_dir: The directory for spilled runs (defaults to the system temp directory).
+    :param block_items: The number of items read back from a spilled run at a time, so
+                        merging k spilled runs holds about k * block_items items.
+    :param stats: If a dictionary is given, it is filled with the chunk_size, the number
+                  of runs, the number of items and peak_items, the most items held in
+                  memory at once.
+    :return: A generator of the sorted items.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if sort_func is None:
+        from hybridSort import hybrid_sort
+        sort_func = hybrid_sort
+    if stats is None:
+        stats = {}
+    stats.update(chunk_size=chunk_size, runs=0, items=0, peak_items=0)
+
+    source = iter(items)
+    runs, paths = [], []
+    try:
+        while True:
+            chunk = list(islice(source, chunk_size))
+            if not chunk:
+                break
+            result = sort_func(chunk)
+            if result is not None:
+                chunk = result  # Out-of-place sorts return the sorted list
+            stats["runs"] += 1
+            stats["items"] += len(chunk)
+            held = len(chunk) + (0 if spill else sum(len(run) for run in runs))
+            stats["peak_items"] = max(stats["peak_items"], held)
+            if spill:
+                paths.append(_spill(chunk, tmp_dir, block_items))
+            else:
+                runs.append(chunk)
+            del chunk, result
+
+        if spill:
+            held = [0]
+            for item in merge_sorted(*[_read_run(path, held) for path in paths]):
+                if held[0] > stats["peak_items"]:
+                    stats["peak_items"] = held[0]
+                yield item
+        elif len(runs) == 1:
+            yield from runs[0]
+        else:
+            yield from merge_sorted(*runs)
+    finally:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+def run_tests(size, chunk_sizes, rep, spill=False, seed=None, plot=True, output=None):
+    """
+    Runs tests on the streaming sort with varying chunk sizes.
+
+    :param size: The number of items in the stream.
+    :param chunk_sizes: A list of chunk sizes to test.
+    :param rep: The number of repetitions for each test.
+    :param spill: Whether to spill the sorted chunks to temporary files.
+    :param seed: A seed that makes the generated streams reproducible.
+    :param plot: Whether to plot the results.
+    :param output: Report path(s): .png/.svg write the plot and .csv the table; see report.plot_results.
+    :return: A dictionary of the average total time, time to the first item and peak items for each chunk size.
+    """
+    from workload import generate_array
+    from report import plot_results
+
+    values = generate_array(size, 0.5, seed=seed)
+    results = {"total": [], "first item": [], "peak items": []}
+    for chunk_size in chunk_sizes:
+        totals, firsts = [], []
+        for _ in range(rep):
+            stats = {}
+            start = time.perf_counter()
+            sorted_items = stream_sort(iter(values), chunk_size, spill=spill, stats=stats)
+            next(sorted_items)
+            firsts.append(time.perf_counter() - start)
+            for _ in sorted_items:
+                pass
+            totals.append(time.perf_counter() - start)
+        results["total"].append(sum(totals) / rep)
+        results["first item"].append(sum(firsts) / rep)
+        results["peak items"].append(stats["peak_items"])
+        print(f'Chunk size: {chunk_size}, Runs: {stats["runs"]}, Peak items: {stats["peak_items"]}, '
+              f'First item: {results["first item"][-1]:.5f}, Total: {results["total"][-1]:.5f}')
+
+    if plot:
+        plot_results(chunk_sizes, {name: results[name] for name in ("total", "first item")},
+                     f'Streaming Sort ({size} items{", spilled" if spill else ""})', xlabel='Chunk Size',
+                     label="{}", output=output, index_name="chunk_size")
+    return results
+
+if __name__ == "__main__":
+    size = 1_000_000  # Number of items in the stream
+    chunk_sizes = [1000, 10000, 100000, 1000000]  # Chunk sizes to test
+    rep = 3  # Number of repetitions for each test
+
+    run_tests(size, chunk_sizes, rep, spill=True)  # Run tests
@@ -0,0 +1,98 @@
+import gc
+import math
+import time
+from buffers import copy_buffer
+
+MIN_BATCH_TIME = 0.002  # Seconds a timed batch should last before loop overhead and clock jitter stop mattering
+MAX_LOOPS = 10000  # Cap on the number of calls in one batch
+
+def _time_batch(func, copies):
+    """
+    Times func on every prepared copy with the garbage collector off.
+
+    :return: The elapsed time in nanoseconds.
+    """
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for arr in copies:
+            func(arr)
+        return time.perf_counter_ns() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+def calibrate(func, arr, warmup=1, min_time=MIN_BATCH_TIME):
+    """
+    Runs the warmup calls and picks how many calls one timed batch needs to last min_time.
+
+    :param func: The function to measure; it is called as func(copy of arr).
+    :param arr: The input, which is never modified.
+    :param warmup: The number of untimed calls made first.
+    :param min_time: The minimum length of a timed batch in seconds.
+    :return: The number of calls per batch.
+    """
+    elapsed = 0
+    for _ in range(max(warmup, 1)):
+        elapsed = _time_batch(func, [copy_buffer(arr)])
+    if elapsed >= min_time * 1e9:
+        return 1
+    return min(MAX_LOOPS, math.ceil(min_time * 1e9 / max(elapsed, 1)))
+
+def measure_time(func, arr, warmup=1, min_time=MIN_BATCH_TIME, loops=None):
+    """
+    Measures the time taken by one call of func on a fresh copy of arr.
+
+    After the warmup, enough copies of arr for one batch are made outside the timed
+    region; the batch is then timed with perf_counter_ns and the garbage collector
+    disabled. Sub-millisecond calls are repeated in a loop until the batch lasts
+    min_time, and the mean per call is returned.
+
+    :param func: The function to measure.
+    :param arr: The input array, which is left untouched.
+    :param warmup: The number of untimed calls made first.
+    :param min_time: The minimum length of a timed batch in seconds.
+    :param loops: The number of calls per batch; calibrated when None.
+    :return: The time taken per call in seconds.
+    """
+    if loops is None:
+        loops = calibrate(func, arr, warmup, min_time)
+    copies = [copy_buffer(arr) for _ in range(loops)]  # Copying stays outside the timed region
+    return _time_batch(func, copies) / loops / 1e9
+
+def summarize(samples, confidence=0.95, resamples=2000, seed=0):
+    """
+    Summarizes repeated timings with robust statistics.
+
+    :param samples: The timings in seconds.
+    :param confidence: The coverage of the bootstrap confidence interval.
+    :param resamples: The number of bootstrap resamples.
+    :param seed: The seed of the bootstrap resampling.
+    :return: A dictionary with the min, median, mean, IQR and the bootstrap
+             confidence interval (ci_low, ci_high) of the median.
+    """
+    import numpy as np  # Kept off the import path of measure_time
+    values = np.asarray(samples, dtype=np.float64)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    rng = np.random.default_rng(seed)
+    medians = np.median(rng.choice(values, (resamples, len(values))), axis=1)
+    tail = (1 - confidence) / 2 * 100
+    ci_low, ci_high = np.percentile(medians, [tail, 100 - tail])
+    return {"min": float(values.min()), "median": float(median), "mean": float(values.mean()),
+            "iqr": float(q3 - q1), "ci_low": float(ci_low), "ci_high": float(ci_high), "samples": len(values)}
+
+def time_call(func, arr, repeats=15, warmup=1, min_time=MIN_BATCH_TIME):
+    """
+    Times func on arr repeatedly and summarizes the per-call times.
+
+    :param func: The function to measure.
+    :param arr: The input array, which is left untouched.
+    :param repeats: The number of timed batches.
+    :param warmup: The number of untimed calls made first.
+    :param min_time: The minimum length of a timed batch in seconds.
+    :return: The summary from summarize().
+    """
+    loops = calibrate(func, arr, warmup, min_time)
+    return summarize([measure_time(func, arr, loops=loops) for _ in range(repeats)])
@@ -0,0 +1,93 @@
+import numpy as np
+
+MODELS = ("presorted", "k_sorted", "inversions", "few_unique", "sawtooth", "duplicates")
+
+def _presorted(rng, size, presortedness):
+    arr = np.arange(size, dtype=np.int64)
+    if presortedness == 0:
+        return arr[::-1]  # Reverse the array for minimum presortedness
+    if presortedness == 1:
+        return arr  # Already sorted array for maximum presortedness
+    rng.shuffle(arr)  # Shuffle the array for random disorder
+    presorted_elements = int(size * presortedness)
+    arr[:presorted_elements].sort()  # Partially sort based on presortedness
+    return arr
+
+def _k_sorted(rng, size, k):
+    # Jitter every sorted position by less than k, so no element ends up k or more places away
+    keys = np.arange(size) + rng.random(size) * k
+    return np.argsort(keys, kind="stable").astype(np.int64)
+
+def _inversions(rng, size, inversions):
+    if inversions > size * (size - 1) // 2:
+        raise ValueError(f"An array of size {size} has at most {size * (size - 1) // 2} inversions")
+    arr = np.arange(size, dtype=np.int64)
+    # Reversing a block of m elements gives m(m-1)/2 inversions; moving the next element
+    # r places to the left adds the remaining r < m
+    m = int((1 + np.sqrt(1 + 8 * inversions)) // 2)
+    while m * (m - 1) // 2 > inversions:
+        m -= 1
+    while (m + 1) * m // 2 <= inversions:
+        m += 1
+    r = inversions - m * (m - 1) // 2
+    block = m + 1 if r else m
+    offset = int(rng.integers(0, size - block + 1)) if size else 0
+    head = arr[offset:offset + m][::-1]
+    if r:
+        head = np.insert(head, m - r, offset + m)
+    arr[offset:offset + block] = head
+    return arr
+
+def _few_unique(rng, size, unique):
+    return rng.integers(0, unique, size, dtype=np.int64)
+
+def _sawtooth(rng, size, runs):
+    # Deal the sorted values round-robin into ascending runs and lay the runs end to end
+    arr = np.arange(size, dtype=np.int64)
+    return np.concatenate([arr[i::runs] for i in range(runs)])
+
+def _duplicates(rng, size, duplicate_fraction):
+    arr = rng.permutation(size).astype(np.int64)
+    arr[rng.random(size) < duplicate_fraction] = size // 2  # Most slots hold the same key
+    return arr
+
+def generate_array(size, presortedness=0.5, model="presorted", seed=None, as_array=False,
+                   k=16, inversions=None, unique=10, runs=8, duplicate_fraction=0.9):
+    """
+    Generates an array of the given size with a specified disorder model.
+
+    The "presorted" model reverses the array for presortedness 0, leaves it sorted
+    for 1, and otherwise shuffles it and sorts the first size * presortedness elements.
+
+    :param size: The size of the array to generate.
+    :param presortedness: The degree to which the array is presorted (0 to 1).
+    :param model: One of "presorted", "k_sorted", "inversions", "few_unique", "sawtooth" or "duplicates".
+    :param seed: A seed, seed sequence or numpy Generator; None draws fresh entropy.
+    :param as_array: Whether to return a contiguous int64 numpy array instead of a list.
+    :param k: For "k_sorted", every element is fewer than k places from its sorted position.
+    :param inversions: For "inversions", the exact number of inversions (defaults to (1 - presortedness) of the maximum).
+    :param unique: For "few_unique", the number of distinct keys.
+    :param runs: For "sawtooth", the number of ascending runs.
+    :param duplicate_fraction: For "duplicates", the fraction of elements sharing one key.
+    :return: A list of integers, or an int64 numpy array.
+    """
+    rng = np.random.default_rng(seed)
+    if model == "presorted":
+        arr = _presorted(rng, size, presortedness)
+    elif model == "k_sorted":
+        arr = _k_sorted(rng, size, k)
+    elif model == "inversions":
+        if inversions is None:
+            inversions = int((1 - presortedness) * (size * (size - 1) // 2))
+        arr = _inversions(rng, size, inversions)
+    elif model == "few_unique":
+        arr = _few_unique(rng, size, unique)
+    elif model == "sawtooth":
+        arr = _sawtooth(rng, size, runs)
+    elif model == "duplicates":
+        arr = _duplicates(rng, size, duplicate_fraction)
+    else:
+        raise ValueError(f"Unknown disorder model {model!r}; expected one of {MODELS}")
+    if as_array:
+        return np.ascontiguousarray(arr, dtype=np.int64)
+    return arr.tolist()